@@ -1,8 +1,14 @@
+import gzip
 from http import HTTPStatus
 
+from django.contrib.auth import get_user_model
 from django.test import TestCase, Client
 from django.urls import reverse
 
+from .views import clear_prerendered
+
+User = get_user_model()
+
 
 class AboutURLTest(TestCase):
     """Проверяем URL приложения about"""
@@ -13,6 +19,9 @@ class AboutURLTest(TestCase):
         cls.about_author = reverse('about:author')
         cls.about_tech = reverse('about:tech')
 
+    def setUp(self):
+        clear_prerendered()
+
     def test_pages_exist_at_desired_location(self):
         pages_for_all_users = {
             self.about_author: HTTPStatus.OK,
@@ -32,3 +41,70 @@ class AboutURLTest(TestCase):
             with self.subTest(url=url):
                 response = self.guest_client.get(url)
                 self.assertTemplateUsed(response, template)
+
+
+class AboutPrerenderTest(TestCase):
+    """Проверяем отдачу заранее отрисованных страниц about"""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.guest_client = Client()
+        cls.about_author = reverse('about:author')
+
+    def setUp(self):
+        clear_prerendered()
+
+    def test_page_rendered_once_and_served_compressed(self):
+        """
+        Проверяем, что шаблон отрисовывается один раз, а клиенту,
+        принимающему gzip, уходит сжатый вариант с долгим кэшем
+        """
+        first = self.guest_client.get(self.about_author)
+        self.assertTemplateUsed(first, 'about/author.html')
+        with self.assertTemplateNotUsed('about/author.html'):
+            second = self.guest_client.get(
+                self.about_author, HTTP_ACCEPT_ENCODING='gzip, deflate'
+            )
+        self.assertEqual(second['Content-Encoding'], 'gzip')
+        self.assertEqual(gzip.decompress(second.content), first.content)
+        self.assertIn('max-age=86400', second['Cache-Control'])
+        self.assertIn('Accept-Encoding', second['Vary'])
+
+    def test_etag_answered_with_not_modified(self):
+        """Проверяем ответ 304 на повторный запрос с ETag"""
+        response = self.guest_client.get(self.about_author)
+        response = self.guest_client.get(
+            self.about_author, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_each_encoding_has_own_etag(self):
+        """Проверяем, что у сжатого и несжатого тела разные ETag"""
+        plain = self.guest_client.get(self.about_author)
+        compressed = self.guest_client.get(
+            self.about_author, HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertNotEqual(plain['ETag'], compressed['ETag'])
+        self.assertIn('Accept-Encoding', plain['Vary'])
+        response = self.guest_client.get(
+            self.about_author, HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=plain['ETag']
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_refused_encoding_not_used(self):
+        """Проверяем, что кодировка с q=0 не используется"""
+        response = self.guest_client.get(
+            self.about_author, HTTP_ACCEPT_ENCODING='gzip;q=0, br;q=0'
+        )
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_authorized_user_gets_fresh_page(self):
+        """Проверяем, что авторизованному пользователю страница рисуется"""
+        self.guest_client.get(self.about_author)
+        client = Client()
+        client.force_login(User.objects.create_user(username='testuser'))
+        response = client.get(self.about_author)
+        self.assertTemplateUsed(response, 'about/author.html')
+        self.assertContains(response, 'testuser')
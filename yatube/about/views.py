@@ -1,11 +1,79 @@
+import hashlib
+
+from django.conf import settings
+from django.http import HttpResponse
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers
+)
+from django.utils.http import quote_etag
 from django.views.generic.base import TemplateView
 
+from core.compression import choose_encoding, compressed_variants
+from core.context_processors.year import year
+
+# Отрисованные страницы: (шаблон, год) -> (хэш, тип, {кодировка: байты})
+_prerendered = {}
+
+
+def clear_prerendered():
+    """Сбрасывает отрисованные страницы, например после смены шаблонов."""
+    _prerendered.clear()
+
+
+class PrerenderedTemplateView(TemplateView):
+    """
+    Статичная страница, которая для анонимных пользователей отрисовывается
+    один раз на процесс и дальше отдается из памяти готовыми байтами,
+    заранее сжатыми gzip и brotli, без обращения к шаблонизатору.
+    """
+    def get(self, request, *args, **kwargs):
+        if request.user.is_authenticated:
+            # Шапка страницы зависит от пользователя
+            return super().get(request, *args, **kwargs)
+        # Год в подвале - единственное, что меняется без деплоя
+        key = (self.template_name, year(request)['year'])
+        page = _prerendered.get(key)
+        if page is None:
+            page = _prerendered[key] = self.prerender(
+                request, *args, **kwargs
+            )
+        digest, content_type, variants = page
+        encoding = choose_encoding(request, variants)
+        # Тела в разных кодировках отличаются побайтно, поэтому у каждого
+        # свой сильный ETag
+        etag = quote_etag(
+            digest if encoding == 'identity' else f'{digest}-{encoding}'
+        )
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = HttpResponse(
+                variants[encoding], content_type=content_type
+            )
+            if encoding != 'identity':
+                response['Content-Encoding'] = encoding
+            response['Content-Length'] = len(variants[encoding])
+        response['ETag'] = etag
+        patch_vary_headers(response, ('Accept-Encoding', 'Cookie'))
+        patch_cache_control(
+            response, public=True, max_age=settings.ABOUT_PAGE_MAX_AGE
+        )
+        return response
+
+    def prerender(self, request, *args, **kwargs):
+        response = super().get(request, *args, **kwargs)
+        response.render()
+        return (
+            hashlib.md5(response.content).hexdigest(),
+            response['Content-Type'],
+            compressed_variants(response.content)
+        )
+
 
-class AboutAuthorView(TemplateView):
+class AboutAuthorView(PrerenderedTemplateView):
 
     template_name = 'about/author.html'
 
 
-class AboutTechView(TemplateView):
+class AboutTechView(PrerenderedTemplateView):
 
     template_name = 'about/tech.html'
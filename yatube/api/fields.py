@@ -0,0 +1,89 @@
+import json
+
+from django.core.files.storage import default_storage
+
+
+def _image_url(name):
+    return default_storage.url(name) if name else None
+
+
+def _thumbnail(raw):
+    return json.loads(raw) if raw else None
+
+
+class Fieldset:
+    """
+    Поля ресурса API: имя в ответе -> путь для values() и необязательное
+    преобразование значения. Параметр ?fields= выбирает часть полей,
+    и связи невыбранных полей не попадают в запрос.
+    """
+    def __init__(self, lookups, converters=None, required=('id',)):
+        self.lookups = lookups
+        self.converters = converters or {}
+        self.required = required
+
+    def select(self, request):
+        """
+        Возвращает запрошенные имена полей, по умолчанию - все.
+        Для неизвестного поля бросает ValueError.
+        """
+        raw = request.GET.get('fields')
+        if not raw:
+            return list(self.lookups)
+        names = [name.strip() for name in raw.split(',') if name.strip()]
+        unknown = [name for name in names if name not in self.lookups]
+        if unknown:
+            raise ValueError(
+                f'Неизвестные поля: {", ".join(unknown)}. '
+                f'Доступны: {", ".join(self.lookups)}'
+            )
+        return names
+
+    def values(self, names):
+        """Пути для values(): выбранные поля и поля, нужные курсору."""
+        lookups = {self.lookups[name] for name in names}
+        lookups.update(self.required)
+        return sorted(lookups)
+
+    def serialize(self, row, names):
+        result = {}
+        for name in names:
+            value = row[self.lookups[name]]
+            converter = self.converters.get(name)
+            result[name] = converter(value) if converter else value
+        return result
+
+
+POST_FIELDS = Fieldset(
+    {
+        'id': 'id',
+        'text': 'text',
+        'pub_date': 'pub_date',
+        'updated': 'updated',
+        'author': 'author__username',
+        'group': 'group__slug',
+        'image': 'image',
+        'thumbnail': 'thumbnails',
+    },
+    converters={'image': _image_url, 'thumbnail': _thumbnail},
+    required=('id', 'pub_date'),
+)
+
+GROUP_FIELDS = Fieldset({
+    'id': 'id',
+    'slug': 'slug',
+    'title': 'title',
+    'description': 'description',
+    'posts_count': 'posts_count',
+})
+
+PROFILE_FIELDS = Fieldset(
+    {
+        'id': 'id',
+        'username': 'username',
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+        'posts_count': 'post_stats__posts_count',
+    },
+    converters={'posts_count': lambda count: count or 0},
+)
@@ -0,0 +1,204 @@
+import gzip
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from posts.models import Group, Post
+
+User = get_user_model()
+
+POSTS_NUM = 25
+
+
+class ApiViewsTest(TestCase):
+    """Проверяем JSON API постов, групп и авторов"""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(
+            username='testuser', first_name='Тест'
+        )
+        cls.user_2 = User.objects.create_user(username='testuser_2')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        for i in range(POSTS_NUM):
+            Post.objects.create(
+                author=cls.user if i % 2 else cls.user_2,
+                text=f'Тестовый текст {i}',
+                group=cls.group if i % 5 == 0 else None
+            )
+        cls.client = Client()
+
+    def get_json(self, url, data=None, **extra):
+        response = self.client.get(url, data, **extra)
+        return response, json.loads(response.content)
+
+    def test_post_list_cursor_walks_whole_feed(self):
+        """Курсор проходит всю ленту от новых постов к старым"""
+        url = reverse('api:post_list') + '?limit=10'
+        seen = []
+        while url:
+            with self.assertNumQueries(1):
+                response, data = self.get_json(url)
+            self.assertEqual(response['Content-Type'],
+                             'application/json; charset=utf-8')
+            seen.extend(post['id'] for post in data['results'])
+            url = data['next']
+        self.assertEqual(seen, list(
+            Post.objects.order_by('-pub_date', '-pk').values_list(
+                'pk', flat=True
+            )
+        ))
+
+    def test_post_list_default_fields(self):
+        """По умолчанию пост отдается со всеми полями"""
+        _, data = self.get_json(reverse('api:post_list'), {'limit': 1})
+        post = Post.objects.order_by('-pub_date', '-pk').first()
+        encoder = DjangoJSONEncoder()
+        self.assertEqual(data['results'][0], {
+            'id': post.pk,
+            'text': post.text,
+            'pub_date': encoder.default(post.pub_date),
+            'updated': encoder.default(post.updated),
+            'author': post.author.username,
+            'group': post.group.slug if post.group else None,
+            'image': None,
+            'thumbnail': None,
+        })
+
+    def test_sparse_fieldset_skips_joins(self):
+        """?fields= ограничивает поля и не джойнит лишние таблицы"""
+        with CaptureQueriesContext(connection) as context:
+            _, data = self.get_json(
+                reverse('api:post_list'), {'fields': 'id,text'}
+            )
+        self.assertEqual(set(data['results'][0]), {'id', 'text'})
+        self.assertNotIn('auth_user', context.captured_queries[0]['sql'])
+
+    def test_unknown_field_rejected(self):
+        """Неизвестное поле - ошибка 400 с описанием"""
+        response, data = self.get_json(
+            reverse('api:post_list'), {'fields': 'id,password'}
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('password', data['detail'])
+
+    def test_group_and_profile_feeds(self):
+        """Ленты группы и автора содержат только их посты"""
+        feeds = {
+            reverse('api:group_posts', args=(self.group.slug,)):
+                self.group.posts.count(),
+            reverse('api:profile_posts', args=(self.user.username,)):
+                self.user.posts.count(),
+        }
+        for url, expected in feeds.items():
+            with self.subTest(url=url):
+                _, data = self.get_json(url, {'limit': 100})
+                self.assertEqual(len(data['results']), expected)
+                self.assertIsNone(data['next'])
+
+    def test_details(self):
+        """Детальные ресурсы поста, группы и автора"""
+        post = Post.objects.first()
+        details = {
+            reverse('api:post_detail', args=(post.pk,)):
+                {'id': post.pk, 'text': post.text},
+            reverse('api:group_detail', args=(self.group.slug,)):
+                {'slug': self.group.slug, 'posts_count': 5},
+            reverse('api:profile_detail', args=(self.user.username,)):
+                {'username': 'testuser', 'first_name': 'Тест',
+                 'posts_count': 12},
+        }
+        for url, expected in details.items():
+            with self.subTest(url=url):
+                _, data = self.get_json(url)
+                for field, value in expected.items():
+                    self.assertEqual(data[field], value)
+
+    def test_missing_resources_return_404(self):
+        """Несуществующие ресурсы - JSON с ошибкой 404"""
+        urls = (
+            reverse('api:post_detail', args=(10 ** 6,)),
+            reverse('api:group_detail', args=('missing',)),
+            reverse('api:group_posts', args=('missing',)),
+            reverse('api:profile_posts', args=('missing',)),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response, data = self.get_json(url)
+                self.assertEqual(response.status_code, 404)
+                self.assertIn('detail', data)
+
+    def test_lists_of_groups_and_profiles(self):
+        """Списки групп и авторов листаются курсором по id"""
+        _, data = self.get_json(reverse('api:profile_list'), {'limit': 1})
+        self.assertEqual(data['results'][0]['username'], 'testuser')
+        _, data = self.get_json(data['next'])
+        self.assertEqual(data['results'][0]['username'], 'testuser_2')
+        self.assertIsNone(data['next'])
+        _, data = self.get_json(reverse('api:group_list'))
+        self.assertEqual([group['slug'] for group in data['results']],
+                         [self.group.slug])
+
+    def test_profiles_show_only_active_authors(self):
+        """Персонал, отключенные и авторы без постов в API не видны"""
+        User.objects.create_user(username='staff', is_staff=True)
+        inactive = User.objects.create_user(username='inactive')
+        Post.objects.create(author=inactive, text='Пост отключенного')
+        inactive.is_active = False
+        inactive.save()
+        _, data = self.get_json(reverse('api:profile_list'))
+        self.assertEqual(
+            [profile['username'] for profile in data['results']],
+            ['testuser', 'testuser_2']
+        )
+        for username in ('staff', 'inactive'):
+            with self.subTest(username=username):
+                response, _ = self.get_json(
+                    reverse('api:profile_detail', args=(username,))
+                )
+                self.assertEqual(response.status_code, 404)
+
+    def test_batch_keeps_order_and_reports_missing(self):
+        """Пакет постов: один запрос, порядок запроса, ненайденные id"""
+        first, second = Post.objects.order_by('pk')[:2]
+        missing = 10 ** 6
+        with self.assertNumQueries(1):
+            _, data = self.get_json(reverse('api:post_batch'), {
+                'ids': f'{second.pk},{missing},{first.pk},{second.pk}',
+                'fields': 'id,author,group',
+            })
+        self.assertEqual(data['results'], [
+            {'id': post.pk, 'author': post.author.username,
+             'group': post.group.slug if post.group else None}
+            for post in (second, first)
+        ])
+        self.assertEqual(data['missing'], [missing])
+
+    def test_batch_rejects_bad_ids(self):
+        """Пустой, неверный или слишком длинный список id - ошибка 400"""
+        too_many = ','.join(map(str, range(1, 302)))
+        for ids in ('', '1,abc', too_many):
+            with self.subTest(ids=ids[:10]):
+                response, data = self.get_json(
+                    reverse('api:post_batch'), {'ids': ids}
+                )
+                self.assertEqual(response.status_code, 400)
+                self.assertIn('detail', data)
+
+    def test_response_gzipped(self):
+        """Ответ сжимается gzip, если клиент его принимает"""
+        response = self.client.get(
+            reverse('api:post_list'), HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        data = json.loads(gzip.decompress(response.content))
+        self.assertEqual(len(data['results']), 20)
@@ -0,0 +1,230 @@
+import base64
+import json
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+
+from core.utils import CURSOR_NEXT, decode_cursor, encode_cursor
+from posts.models import Group, Post, User
+from .fields import GROUP_FIELDS, POST_FIELDS, PROFILE_FIELDS
+
+# Позиция поста в ленте для курсора
+Position = namedtuple('Position', 'pub_date pk')
+
+
+def json_response(data, status=200):
+    return HttpResponse(
+        json.dumps(data, cls=DjangoJSONEncoder, ensure_ascii=False),
+        content_type='application/json; charset=utf-8',
+        status=status
+    )
+
+
+def error(detail, status):
+    return json_response({'detail': detail}, status=status)
+
+
+def page_limit(request):
+    try:
+        limit = int(request.GET.get('limit', settings.API_PAGE_SIZE))
+    except ValueError:
+        limit = settings.API_PAGE_SIZE
+    return min(max(limit, 1), settings.API_MAX_PAGE_SIZE)
+
+
+def next_url(request, token):
+    query = request.GET.copy()
+    query['cursor'] = token
+    return request.build_absolute_uri(f'{request.path}?{query.urlencode()}')
+
+
+def encode_id_cursor(pk):
+    return base64.urlsafe_b64encode(str(pk).encode()).decode().rstrip('=')
+
+
+def decode_id_cursor(token):
+    try:
+        return int(base64.urlsafe_b64decode(token + '=' * (-len(token) % 4)))
+    except ValueError:
+        return None
+
+
+def post_rows(request, queryset, names):
+    """
+    Страница постов от новых к старым по курсору (pub_date, id).
+    Каждая строка - словарь из values(), модели не создаются.
+    """
+    limit = page_limit(request)
+    rows = queryset.order_by('-pub_date', '-id').values(
+        *POST_FIELDS.values(names)
+    )
+    cursor = decode_cursor(request.GET.get('cursor', ''))
+    if cursor is not None and cursor[0] == CURSOR_NEXT:
+        _, pub_date, pk = cursor
+        rows = rows.filter(
+            Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=pk)
+        )
+    rows = list(rows[:limit + 1])
+    next_page = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        last = rows[-1]
+        next_page = next_url(request, encode_cursor(
+            Position(last['pub_date'], last['id']), CURSOR_NEXT
+        ))
+    return {
+        'results': [POST_FIELDS.serialize(row, names) for row in rows],
+        'next': next_page,
+    }
+
+
+def id_rows(request, queryset, fieldset, names):
+    """Страница записей по возрастанию id с курсором по id."""
+    limit = page_limit(request)
+    rows = queryset.order_by('id').values(*fieldset.values(names))
+    after = decode_id_cursor(request.GET.get('cursor', ''))
+    if after is not None:
+        rows = rows.filter(id__gt=after)
+    rows = list(rows[:limit + 1])
+    next_page = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_page = next_url(request, encode_id_cursor(rows[-1]['id']))
+    return {
+        'results': [fieldset.serialize(row, names) for row in rows],
+        'next': next_page,
+    }
+
+
+def detail(request, queryset, fieldset, **lookup):
+    try:
+        names = fieldset.select(request)
+    except ValueError as exc:
+        return error(str(exc), 400)
+    row = queryset.filter(**lookup).values(*fieldset.values(names)).first()
+    if row is None:
+        return error('Не найдено.', 404)
+    return json_response(fieldset.serialize(row, names))
+
+
+def post_feed(request, queryset):
+    try:
+        names = POST_FIELDS.select(request)
+    except ValueError as exc:
+        return error(str(exc), 400)
+    return json_response(post_rows(request, queryset, names))
+
+
+def id_list(request, queryset, fieldset):
+    try:
+        names = fieldset.select(request)
+    except ValueError as exc:
+        return error(str(exc), 400)
+    return json_response(id_rows(request, queryset, fieldset, names))
+
+
+@require_GET
+def post_list(request):
+    return post_feed(request, Post.objects.all())
+
+
+@require_GET
+def post_detail(request, post_id):
+    return detail(request, Post.objects.all(), POST_FIELDS, id=post_id)
+
+
+def parse_ids(raw):
+    """Разбирает список id через запятую, для мусора бросает ValueError."""
+    ids = []
+    for item in raw.split(','):
+        item = item.strip()
+        if not item:
+            continue
+        if not item.isdigit():
+            raise ValueError(f'Неверный id поста: {item}')
+        ids.append(int(item))
+    return list(dict.fromkeys(ids))
+
+
+@require_GET
+def post_batch(request):
+    """
+    Отдает несколько постов по списку ?ids= одним запросом к базе
+    в порядке запроса и перечисляет id, которых не нашлось.
+    """
+    try:
+        names = POST_FIELDS.select(request)
+        ids = parse_ids(request.GET.get('ids', ''))
+    except ValueError as exc:
+        return error(str(exc), 400)
+    if not ids:
+        return error('Передайте id постов в параметре ids.', 400)
+    if len(ids) > settings.API_BATCH_MAX_IDS:
+        return error(
+            f'Не больше {settings.API_BATCH_MAX_IDS} id за запрос.', 400
+        )
+    rows = {
+        row['id']: row
+        for row in Post.objects.filter(id__in=ids).values(
+            *POST_FIELDS.values(names)
+        )
+    }
+    return json_response({
+        'results': [
+            POST_FIELDS.serialize(rows[pk], names)
+            for pk in ids if pk in rows
+        ],
+        'missing': [pk for pk in ids if pk not in rows],
+    })
+
+
+@require_GET
+def group_list(request):
+    return id_list(request, Group.objects.all(), GROUP_FIELDS)
+
+
+@require_GET
+def group_detail(request, slug):
+    return detail(request, Group.objects.all(), GROUP_FIELDS, slug=slug)
+
+
+@require_GET
+def group_posts(request, slug):
+    if not Group.objects.filter(slug=slug).exists():
+        return error('Не найдено.', 404)
+    return post_feed(request, Post.objects.filter(group__slug=slug))
+
+
+def public_profiles():
+    """
+    Авторы, которых показывает API: активные и с постами.
+    Персонал без постов и отключенные учетные записи не раскрываются.
+    """
+    return User.objects.filter(
+        is_active=True, post_stats__posts_count__gt=0
+    )
+
+
+@require_GET
+def profile_list(request):
+    return id_list(request, public_profiles(), PROFILE_FIELDS)
+
+
+@require_GET
+def profile_detail(request, username):
+    return detail(
+        request, public_profiles(), PROFILE_FIELDS, username=username
+    )
+
+
+@require_GET
+def profile_posts(request, username):
+    if not User.objects.filter(username=username).exists():
+        return error('Не найдено.', 404)
+    return post_feed(
+        request, Post.objects.filter(author__username=username)
+    )
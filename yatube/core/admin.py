@@ -0,0 +1,18 @@
+from django.contrib import admin
+
+from .models import Task
+
+
+class TaskAdmin(admin.ModelAdmin):
+    list_display = (
+        'pk',
+        'name',
+        'status',
+        'attempts',
+        'run_after'
+    )
+    list_filter = ('status', 'name')
+    readonly_fields = ('error',)
+
+
+admin.site.register(Task, TaskAdmin)
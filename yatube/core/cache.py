@@ -0,0 +1,157 @@
+import calendar
+import hashlib
+import threading
+import uuid
+from collections import Counter
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+# Счетчики попаданий и промахов кэша страниц в текущем процессе
+page_cache_stats = Counter()
+_stats_lock = threading.Lock()
+
+
+def generation_key(name):
+    """
+    Ключ поколения области. Имя области содержит адрес группы или имя
+    автора, поэтому хэшируется: memcached не принимает в ключах пробелы
+    и не-ASCII символы.
+    """
+    return f'generation:{hashlib.md5(name.encode()).hexdigest()}'
+
+
+def cache_generation(name):
+    """
+    Возвращает текущее поколение именованной области кэша.
+    Поколение входит в ключи записей, поэтому его смена сбрасывает область.
+    """
+    key = generation_key(name)
+    generation = cache.get(key)
+    if generation is None:
+        generation = uuid.uuid4().hex
+        cache.set(key, generation, None)
+    return generation
+
+
+def rotate_generations(*names):
+    """Сбрасывает именованные области кэша, меняя их поколения."""
+    cache.set_many(
+        {generation_key(name): uuid.uuid4().hex for name in names}, None
+    )
+
+
+def rotate_after_commit(*names):
+    """
+    Сбрасывает области сразу и еще раз после фиксации текущей транзакции.
+    Запрос, пришедший между первым сбросом и фиксацией, видит старые
+    данные и сохранил бы их под новым поколением - второй сброс их убирает.
+    """
+    rotate_generations(*names)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: rotate_generations(*names))
+
+
+def _count_page_cache(result):
+    with _stats_lock:
+        page_cache_stats[result] += 1
+
+
+def page_cache_key(view_name, scope, request):
+    raw = '|'.join((
+        view_name,
+        request.GET.get('page', ''),
+        request.GET.get('cursor', ''),
+    ))
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    generations = (cache_generation('page'), cache_generation(f'page:{scope}'))
+    return 'page:{}:{}:{}'.format(*generations, digest)
+
+
+def invalidate_pages(*scopes):
+    """Сбрасывает закэшированные страницы указанных областей."""
+    rotate_after_commit(*(f'page:{scope}' for scope in scopes))
+
+
+def invalidate_all_pages():
+    """Сбрасывает все закэшированные страницы."""
+    rotate_after_commit('page')
+
+
+def cache_anonymous_page(scope):
+    """
+    Кэширует страницу целиком для анонимных пользователей.
+    scope получает аргументы view и возвращает имя области,
+    по которой страницу можно сбросить через invalidate_pages.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method != 'GET' or request.user.is_authenticated:
+                return view(request, *args, **kwargs)
+            key = page_cache_key(view.__name__, scope(**kwargs), request)
+            cached = cache.get(key)
+            if cached is not None:
+                _count_page_cache('hits')
+                content_type, content = cached
+                response = HttpResponse(content, content_type=content_type)
+                response['X-Page-Cache'] = 'HIT'
+            else:
+                _count_page_cache('misses')
+                response = view(request, *args, **kwargs)
+                if response.status_code == 200 and not response.streaming:
+                    cache.set(
+                        key,
+                        (response['Content-Type'], response.content),
+                        settings.PAGE_CACHE_TIMEOUT
+                    )
+                response['X-Page-Cache'] = 'MISS'
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
+
+
+def conditional_page(version):
+    """
+    Отвечает 304 Not Modified, если у клиента актуальная версия страницы.
+    version получает аргументы view и дешево, без отрисовки, возвращает
+    пару (дата последнего изменения, строка версии) или None.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            current = None
+            if request.method in ('GET', 'HEAD'):
+                current = version(**kwargs)
+            if current is None:
+                return view(request, *args, **kwargs)
+            last_modified, token = current
+            # Страница зависит от пользователя и параметров запроса
+            raw = '|'.join((
+                token, str(request.user.pk), request.GET.urlencode()
+            ))
+            etag = quote_etag(hashlib.md5(raw.encode()).hexdigest())
+            timestamp = None
+            if last_modified is not None and (
+                not request.user.is_authenticated
+            ):
+                timestamp = calendar.timegm(last_modified.utctimetuple())
+            response = get_conditional_response(
+                request, etag=etag, last_modified=timestamp
+            )
+            if response is None:
+                response = view(request, *args, **kwargs)
+            if response.status_code in (200, 304):
+                response['ETag'] = etag
+                if timestamp is not None:
+                    response['Last-Modified'] = http_date(timestamp)
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.core.checks import Error, Warning, register
+
+# Кэши, состояние которых видно только своему процессу
+LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+def is_local_cache(alias):
+    return settings.CACHES[alias]['BACKEND'] in LOCAL_CACHE_BACKENDS
+
+
+@register(deploy=True)
+def check_shared_cache(app_configs, **kwargs):
+    """
+    В работе сайт обслуживают несколько процессов, и сброс кэша
+    страниц и раскладка постов по лентам должны быть видны каждому.
+    Проверка для check --deploy: в разработке хватает памяти процесса.
+    """
+    hint = 'Задайте общий кэш: CACHE_BACKEND=redis или memcached.'
+    messages = []
+    if is_local_cache('default'):
+        messages.append(Warning(
+            'Кэш страниц хранится в памяти процесса: после изменения поста '
+            'другие процессы отдают старые страницы до PAGE_CACHE_TIMEOUT.',
+            hint=hint,
+            id='core.W001',
+        ))
+    if is_local_cache(settings.TIMELINE_CACHE):
+        messages.append(Warning(
+            'Ленты хранятся в памяти процесса: новый пост попадает только '
+            'в ленту процесса, который его сохранил, остальные видят его '
+            'через TIMELINE_TIMEOUT.',
+            hint=hint,
+            id='core.W002',
+        ))
+    return messages
+
+
+@register(deploy=True)
+def check_worker_cache(app_configs, **kwargs):
+    """
+    Без TASKS_EAGER задачи выполняет отдельный процесс run_worker:
+    раскладка по лентам, сброс страниц и карточек из задач должны
+    попадать в кэш, который читают процессы сайта.
+    Проверка для check --deploy, как и check_shared_cache.
+    """
+    if settings.TASKS_EAGER:
+        return []
+    aliases = sorted({
+        'default', settings.TIMELINE_CACHE, settings.POST_CARD_CACHE
+    })
+    local = [alias for alias in aliases if is_local_cache(alias)]
+    if not local:
+        return []
+    return [Error(
+        'Фоновые задачи выполняются в процессе run_worker, а кэши '
+        f'{", ".join(local)} хранятся в памяти процесса: сайт не увидит '
+        'новые посты в лентах и обновленные миниатюры.',
+        hint='Задайте общий кэш (CACHE_BACKEND=redis или memcached) '
+             'или включите TASKS_EAGER.',
+        id='core.E001',
+    )]
@@ -0,0 +1,83 @@
+from gzip import GzipFile
+from io import BytesIO
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Кодировки в порядке предпочтения, identity - без сжатия
+ENCODINGS = ('br', 'gzip', 'identity')
+
+
+def available_encodings():
+    """Кодировки, которыми можно сжимать: brotli - если установлен."""
+    return tuple(
+        encoding for encoding in ENCODINGS
+        if encoding != 'br' or brotli is not None
+    )
+
+
+def compress(content, encoding, best=False):
+    """
+    Сжимает содержимое указанной кодировкой. best=True - максимальное
+    сжатие для того, что сжимается один раз и отдается много раз,
+    иначе быстрый уровень для сжатия на лету.
+    """
+    if encoding == 'br':
+        return brotli.compress(content, quality=11 if best else 5)
+    buffer = BytesIO()
+    # Нулевое время в заголовке делает результат воспроизводимым
+    with GzipFile(mode='wb', compresslevel=9 if best else 6,
+                  fileobj=buffer, mtime=0) as archive:
+        archive.write(content)
+    return buffer.getvalue()
+
+
+def compressed_variants(content, best=True):
+    """
+    Сжимает содержимое всеми доступными кодировками.
+    Варианты, которые не меньше исходника, отбрасываются.
+    """
+    variants = {'identity': content}
+    for encoding in available_encodings():
+        if encoding == 'identity':
+            continue
+        data = compress(content, encoding, best)
+        if len(data) < len(content):
+            variants[encoding] = data
+    return variants
+
+
+def _quality(params):
+    for param in params:
+        name, _, value = param.partition('=')
+        if name.strip() == 'q':
+            try:
+                return float(value)
+            except ValueError:
+                return 0
+    return 1
+
+
+def accepted_encodings(request):
+    """Кодировки из заголовка Accept-Encoding, кроме запрещенных q=0."""
+    accepted = set()
+    header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    for item in header.split(','):
+        encoding, *params = item.split(';')
+        encoding = encoding.strip().lower()
+        if encoding and _quality(params) > 0:
+            accepted.add(encoding)
+    if '*' in accepted:
+        accepted.update(ENCODINGS)
+    return accepted
+
+
+def choose_encoding(request, available):
+    """Выбирает лучшую из доступных кодировок, которую примет клиент."""
+    accepted = accepted_encodings(request) | {'identity'}
+    for encoding in ENCODINGS:
+        if encoding in available and encoding in accepted:
+            return encoding
+    return 'identity'
@@ -0,0 +1,21 @@
+from django.conf import settings
+from django.db.backends.sqlite3 import base
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """
+    SQLite с журналом WAL и настроенными pragma из SQLITE_PRAGMAS:
+    читатели не блокируют писателя, а запись не ждет fsync на каждый
+    коммит. Транзакции начинаются с BEGIN IMMEDIATE - блокировка записи
+    берется сразу и ждет своей очереди по timeout, вместо ошибки
+    database is locked при попытке повысить блокировку посреди транзакции.
+    """
+    def get_new_connection(self, conn_params):
+        connection = super().get_new_connection(conn_params)
+        if not self.is_in_memory_db():
+            for pragma in settings.SQLITE_PRAGMAS:
+                connection.execute(f'PRAGMA {pragma}')
+        return connection
+
+    def _start_transaction_under_autocommit(self):
+        self.cursor().execute('BEGIN IMMEDIATE')
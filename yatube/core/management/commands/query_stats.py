@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+
+from core.queries import load_query_stats
+
+ORDERINGS = ('total_ms', 'count', 'p95_ms')
+
+
+class Command(BaseCommand):
+    help = 'Выводит самые затратные формы SQL-запросов по всем процессам'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--top', type=int, default=20)
+        parser.add_argument('--order', choices=ORDERINGS, default='total_ms')
+
+    def handle(self, *args, **options):
+        rows = sorted(
+            load_query_stats(), key=lambda row: row[options['order']],
+            reverse=True
+        )[:options['top']]
+        if not rows:
+            self.stdout.write('Статистики запросов пока нет')
+            return
+        self.stdout.write(
+            f'{"count":>8} {"total, мс":>12} {"p95, мс":>10}  '
+            f'{"view":<30} запрос'
+        )
+        for row in rows:
+            self.stdout.write(
+                f'{row["count"]:>8} {row["total_ms"]:>12.1f} '
+                f'{row["p95_ms"]:>10.2f}  {row["top_view"]:<30} '
+                f'{row["fingerprint"]}'
+            )
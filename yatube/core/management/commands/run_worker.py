@@ -0,0 +1,53 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from core.queue import Worker
+
+
+class Command(BaseCommand):
+    help = 'Выполняет фоновые задачи из очереди в базе данных'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--threads', type=int, default=settings.TASKS_WORKER_THREADS
+        )
+        parser.add_argument('--batch-size', type=int)
+        parser.add_argument(
+            '--poll-interval', type=float, default=1.0,
+            help='Пауза в секундах, когда очередь пуста'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Разобрать очередь и завершиться'
+        )
+
+    def handle(self, *args, **options):
+        worker = Worker(options['threads'], options['batch_size'])
+        # Брошенные задачи ищем не только при запуске: другой воркер
+        # может упасть, пока этот работает
+        requeue_every = settings.TASKS_STALE_TIMEOUT / 2
+        requeue_at = time.monotonic()
+        done = 0
+        try:
+            while True:
+                if time.monotonic() >= requeue_at:
+                    requeued = worker.requeue_stale()
+                    if requeued:
+                        self.stdout.write(
+                            f'Возвращено в очередь задач: {requeued}'
+                        )
+                    requeue_at = time.monotonic() + requeue_every
+                count = worker.run_once()
+                done += count
+                if count:
+                    continue
+                if options['once']:
+                    break
+                time.sleep(options['poll_interval'])
+        except KeyboardInterrupt:
+            pass
+        finally:
+            worker.shutdown()
+        self.stdout.write(f'Обработано задач: {done}')
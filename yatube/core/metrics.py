@@ -0,0 +1,87 @@
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+# Границы корзин гистограмм в секундах, как принято в Prometheus
+TIME_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histogram:
+    """Накопительная гистограмма в памяти процесса с метками view."""
+    def __init__(self, name, help_text, buckets):
+        self.name = name
+        self.help_text = help_text
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counts = defaultdict(lambda: [0] * (len(buckets) + 1))
+        self._sums = defaultdict(float)
+
+    def observe(self, view, value):
+        with self._lock:
+            self._counts[view][bisect_left(self.buckets, value)] += 1
+            self._sums[view] += value
+
+    def reset(self):
+        with self._lock:
+            self._counts.clear()
+            self._sums.clear()
+
+    def render(self):
+        """Выводит гистограмму в текстовом формате Prometheus."""
+        lines = [
+            f'# HELP {self.name} {self.help_text}',
+            f'# TYPE {self.name} histogram',
+        ]
+        with self._lock:
+            for view in sorted(self._counts):
+                total = 0
+                bounds = [*map(str, self.buckets), '+Inf']
+                for bound, count in zip(bounds, self._counts[view]):
+                    total += count
+                    lines.append(
+                        f'{self.name}_bucket{{view="{view}",le="{bound}"}} '
+                        f'{total}'
+                    )
+                lines.append(
+                    f'{self.name}_sum{{view="{view}"}} {self._sums[view]}'
+                )
+                lines.append(f'{self.name}_count{{view="{view}"}} {total}')
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    'yatube_request_duration_seconds',
+    'Полное время обработки запроса', TIME_BUCKETS
+)
+DB_DURATION = Histogram(
+    'yatube_db_duration_seconds',
+    'Время выполнения SQL-запросов за запрос', TIME_BUCKETS
+)
+TEMPLATE_DURATION = Histogram(
+    'yatube_template_duration_seconds',
+    'Время отрисовки шаблонов за запрос', TIME_BUCKETS
+)
+DB_QUERIES = Histogram(
+    'yatube_db_queries',
+    'Число SQL-запросов за запрос', QUERY_BUCKETS
+)
+HISTOGRAMS = (REQUEST_DURATION, DB_DURATION, TEMPLATE_DURATION, DB_QUERIES)
+
+
+def render_metrics(counters=()):
+    """
+    Собирает все гистограммы и счетчики в текст для Prometheus.
+    counters - пары (имя, описание, {метка: значение}).
+    """
+    lines = []
+    for histogram in HISTOGRAMS:
+        lines.extend(histogram.render())
+    for name, help_text, values in counters:
+        lines.append(f'# HELP {name} {help_text}')
+        lines.append(f'# TYPE {name} counter')
+        for label, value in sorted(values.items()):
+            lines.append(f'{name}{{result="{label}"}} {value}')
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,117 @@
+import time
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.db import connections
+from django.utils.cache import patch_vary_headers
+
+from .compression import available_encodings, choose_encoding, compress
+from .metrics import (
+    DB_DURATION, DB_QUERIES, REQUEST_DURATION, TEMPLATE_DURATION
+)
+from .queries import query_stats
+from .template_backends import start_template_timing, stop_template_timing
+
+
+def view_name(request):
+    match = getattr(request, 'resolver_match', None)
+    return match.view_name if match else 'unresolved'
+
+
+class QueryRecorder:
+    """
+    Обертка выполнения SQL: считает запросы и их суммарное время
+    и передает каждый запрос в статистику по отпечаткам.
+    """
+    def __init__(self, request):
+        self.request = request
+        self.count = 0
+        self.duration = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            duration = time.perf_counter() - started
+            self.count += 1
+            self.duration += duration
+            query_stats.record(sql, duration, view_name(self.request))
+
+
+class MetricsMiddleware:
+    """
+    Замеряет число SQL-запросов, время базы, шаблонов и всего запроса,
+    копит их в гистограммах по view и отдает в заголовке Server-Timing.
+    Время шаблонов замеряет шаблонизатор core.template_backends.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        recorder = QueryRecorder(request)
+        start_template_timing()
+        started = time.perf_counter()
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(recorder))
+            response = self.get_response(request)
+        total = time.perf_counter() - started
+        template_time = stop_template_timing()
+        view = view_name(request)
+        REQUEST_DURATION.observe(view, total)
+        DB_DURATION.observe(view, recorder.duration)
+        TEMPLATE_DURATION.observe(view, template_time)
+        DB_QUERIES.observe(view, recorder.count)
+        response['Server-Timing'] = ', '.join((
+            f'db;dur={recorder.duration * 1000:.2f};'
+            f'desc="{recorder.count} queries"',
+            f'tpl;dur={template_time * 1000:.2f}',
+            f'total;dur={total * 1000:.2f}',
+        ))
+        return response
+
+
+class CompressionMiddleware:
+    """
+    Сжимает HTML-страницы и JSON приложений из COMPRESSION_NAMESPACES
+    лучшей кодировкой, которую принимает клиент. Страницы с CSRF-токеном
+    не сжимаются, чтобы не открывать атаку BREACH.
+    """
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.should_compress(request, response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request, available_encodings())
+        if encoding == 'identity':
+            return response
+        content = compress(response.content, encoding)
+        if len(content) >= len(response.content):
+            return response
+        response.content = content
+        response['Content-Length'] = str(len(content))
+        response['Content-Encoding'] = encoding
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            # Сжатое тело отличается побайтно - ETag становится слабым
+            response['ETag'] = 'W/' + etag
+        return response
+
+    def should_compress(self, request, response):
+        match = getattr(request, 'resolver_match', None)
+        return (
+            match is not None
+            and match.namespace in settings.COMPRESSION_NAMESPACES
+            and not response.streaming
+            and response.status_code == 200
+            and not response.has_header('Content-Encoding')
+            and response.get('Content-Type', '').startswith(
+                settings.COMPRESSION_CONTENT_TYPES
+            )
+            and len(response.content) >= settings.COMPRESSION_MIN_SIZE
+            and not request.META.get('CSRF_COOKIE_USED')
+        )
@@ -0,0 +1,36 @@
+# Generated by Django 2.2.16 on 2026-10-18 12:00
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Task',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=200, verbose_name='задача')),
+                ('args', models.TextField(default='[]', verbose_name='аргументы в JSON')),
+                ('status', models.CharField(choices=[('pending', 'в очереди'), ('running', 'выполняется'), ('failed', 'завершилась ошибкой')], default='pending', max_length=10, verbose_name='состояние')),
+                ('attempts', models.PositiveIntegerField(default=0, verbose_name='число попыток')),
+                ('run_after', models.DateTimeField(default=django.utils.timezone.now, verbose_name='выполнить не раньше')),
+                ('started', models.DateTimeField(blank=True, null=True, verbose_name='начало выполнения')),
+                ('error', models.TextField(blank=True, verbose_name='последняя ошибка')),
+            ],
+            options={
+                'verbose_name': 'фоновая задача',
+                'verbose_name_plural': 'фоновые задачи',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['status', 'run_after'], name='task_status_run_idx'),
+        ),
+    ]
@@ -0,0 +1,57 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    PENDING = 'pending'
+    RUNNING = 'running'
+    FAILED = 'failed'
+    STATUSES = (
+        (PENDING, 'в очереди'),
+        (RUNNING, 'выполняется'),
+        (FAILED, 'завершилась ошибкой'),
+    )
+
+    name = models.CharField(
+        verbose_name='задача',
+        max_length=200
+    )
+    args = models.TextField(
+        verbose_name='аргументы в JSON',
+        default='[]'
+    )
+    status = models.CharField(
+        verbose_name='состояние',
+        max_length=10,
+        choices=STATUSES,
+        default=PENDING
+    )
+    attempts = models.PositiveIntegerField(
+        verbose_name='число попыток',
+        default=0
+    )
+    run_after = models.DateTimeField(
+        verbose_name='выполнить не раньше',
+        default=timezone.now
+    )
+    started = models.DateTimeField(
+        verbose_name='начало выполнения',
+        null=True,
+        blank=True
+    )
+    error = models.TextField(
+        verbose_name='последняя ошибка',
+        blank=True
+    )
+
+    class Meta:
+        verbose_name = 'фоновая задача'
+        verbose_name_plural = 'фоновые задачи'
+        indexes = [
+            models.Index(
+                fields=['status', 'run_after'], name='task_status_run_idx'
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.name}{self.args}'
@@ -0,0 +1,159 @@
+import json
+import logging
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import defaultdict, deque
+
+from django.conf import settings
+
+logger = logging.getLogger('yatube.slow_queries')
+
+# Литералы и списки параметров заменяются на ?, чтобы запросы одной
+# формы с разными значениями давали один отпечаток
+STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER = re.compile(r'%s|\?')
+IN_LIST = re.compile(r'\bIN\s*\(\s*\?(?:\s*,\s*\?)*\s*\)', re.IGNORECASE)
+VALUES_LIST = re.compile(r'(\(\?(?:, \?)*\))(?:, \1)+')
+WHITESPACE = re.compile(r'\s+')
+
+
+def fingerprint(sql):
+    """Приводит SQL к форме без конкретных значений."""
+    sql = STRING_LITERAL.sub('?', sql)
+    sql = NUMBER.sub('?', sql)
+    sql = PLACEHOLDER.sub('?', sql)
+    sql = WHITESPACE.sub(' ', sql).strip()
+    sql = IN_LIST.sub('IN (...)', sql)
+    return VALUES_LIST.sub(r'\1, ...', sql)
+
+
+class QueryStats:
+    """
+    Статистика SQL по отпечаткам в памяти процесса: число, суммарное
+    время и последние замеры для p95. Периодически сбрасывается в файл,
+    чтобы команда query_stats могла собрать данные всех процессов.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._stats = {}
+        self._last_flush = time.monotonic()
+
+    def record(self, sql, duration, view):
+        key = fingerprint(sql)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = {
+                    'count': 0,
+                    'total': 0.0,
+                    'samples': deque(maxlen=settings.QUERY_STATS_SAMPLES),
+                    'views': defaultdict(int),
+                }
+            stats['count'] += 1
+            stats['total'] += duration
+            stats['samples'].append(duration)
+            stats['views'][view] += 1
+        if duration * 1000 >= settings.SLOW_QUERY_THRESHOLD_MS:
+            logger.warning(
+                'Медленный запрос %.1f мс во view %s: %s',
+                duration * 1000, view, sql
+            )
+        if self._flush_due():
+            self.flush(only_if_due=True)
+
+    def _flush_due(self):
+        return time.monotonic() - self._last_flush >= (
+            settings.QUERY_STATS_FLUSH_INTERVAL
+        )
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                key: {
+                    'count': stats['count'],
+                    'total': stats['total'],
+                    'samples': list(stats['samples']),
+                    'views': dict(stats['views']),
+                }
+                for key, stats in self._stats.items()
+            }
+
+    def flush(self, only_if_due=False):
+        """
+        Сохраняет статистику процесса в каталог QUERY_STATS_DIR.
+        Вызывается из обертки запросов, поэтому сбрасывает один поток
+        за раз, а ошибки записи только логируются и не ломают запрос.
+        """
+        with self._flush_lock:
+            # Пока ждали блокировку, статистику мог сбросить другой поток
+            if only_if_due and not self._flush_due():
+                return
+            self._last_flush = time.monotonic()
+            try:
+                self._write()
+            except Exception:
+                logger.exception('Не удалось сохранить статистику запросов')
+
+    def _write(self):
+        directory = settings.QUERY_STATS_DIR
+        os.makedirs(directory, exist_ok=True)
+        descriptor, tmp_path = tempfile.mkstemp(
+            dir=directory, prefix=f'{os.getpid()}.', suffix='.tmp'
+        )
+        try:
+            with os.fdopen(descriptor, 'w') as dump:
+                json.dump(self.snapshot(), dump)
+            os.replace(
+                tmp_path, os.path.join(directory, f'{os.getpid()}.json')
+            )
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+
+
+query_stats = QueryStats()
+
+
+def _percentile(values, percent):
+    values = sorted(values)
+    return values[round(percent / 100 * (len(values) - 1))]
+
+
+def load_query_stats():
+    """Собирает статистику всех процессов в таблицу по отпечаткам."""
+    merged = {}
+    directory = settings.QUERY_STATS_DIR
+    names = os.listdir(directory) if os.path.isdir(directory) else []
+    for name in names:
+        if not name.endswith('.json'):
+            continue
+        with open(os.path.join(directory, name)) as dump:
+            for key, stats in json.load(dump).items():
+                row = merged.setdefault(key, {
+                    'count': 0, 'total': 0.0, 'samples': [],
+                    'views': defaultdict(int),
+                })
+                row['count'] += stats['count']
+                row['total'] += stats['total']
+                row['samples'].extend(stats['samples'])
+                for view, count in stats['views'].items():
+                    row['views'][view] += count
+    return [
+        {
+            'fingerprint': key,
+            'count': row['count'],
+            'total_ms': row['total'] * 1000,
+            'p95_ms': _percentile(row['samples'], 95) * 1000,
+            'top_view': max(row['views'], key=row['views'].get),
+        }
+        for key, row in merged.items()
+    ]
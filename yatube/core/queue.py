@@ -0,0 +1,123 @@
+import json
+import logging
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connection
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger('yatube.tasks')
+
+# Зарегистрированные задачи по именам
+registry = {}
+
+
+def task(func):
+    """
+    Регистрирует функцию как фоновую задачу.
+    Вызов func.delay(*args) ставит ее в очередь, аргументы - JSON.
+    """
+    name = f'{func.__module__}.{func.__name__}'
+    registry[name] = func
+    func.task_name = name
+    func.delay = lambda *args: enqueue(name, *args)
+    return func
+
+
+def enqueue(name, *args):
+    """
+    Ставит задачу в очередь. Строка очереди пишется в текущей транзакции,
+    поэтому задача откатится вместе с изменением, которое ее породило.
+    В режиме TASKS_EAGER задача выполняется сразу в этом же процессе.
+    """
+    if settings.TASKS_EAGER:
+        registry[name](*args)
+        return None
+    return Task.objects.create(name=name, args=json.dumps(args))
+
+
+def run_task(task):
+    """
+    Выполняет задачу из очереди. Успешная задача удаляется, упавшая
+    откладывается с нарастающей задержкой, а после TASKS_MAX_ATTEMPTS
+    попыток остается в таблице со статусом failed. Исключения не
+    выпускаются наружу, чтобы не остановить воркер.
+    """
+    try:
+        registry[task.name](*json.loads(task.args))
+    except Exception:
+        task.attempts += 1
+        task.error = traceback.format_exc()
+        if task.attempts < settings.TASKS_MAX_ATTEMPTS:
+            task.status = Task.PENDING
+            task.run_after = timezone.now() + timedelta(
+                seconds=settings.TASKS_RETRY_DELAY * task.attempts
+            )
+        else:
+            task.status = Task.FAILED
+            logger.error('Задача %s не выполнена: %s', task, task.error)
+        try:
+            task.save(
+                update_fields=('attempts', 'error', 'status', 'run_after')
+            )
+        except Exception:
+            # Задача остается в статусе running и вернется в очередь
+            # через requeue_stale, а воркер продолжает работу
+            logger.exception('Не удалось сохранить задачу %s', task)
+        return False
+    Task.objects.filter(pk=task.pk).delete()
+    return True
+
+
+class Worker:
+    """
+    Разбирает очередь задач пулом потоков. Задачи захватываются
+    условным UPDATE, поэтому несколько воркеров не выполнят одну задачу
+    дважды.
+    """
+    def __init__(self, threads=None, batch_size=None):
+        self.threads = threads or settings.TASKS_WORKER_THREADS
+        self.batch_size = batch_size or self.threads * 10
+        self.executor = ThreadPoolExecutor(self.threads)
+
+    def requeue_stale(self):
+        """Возвращает в очередь задачи, брошенные упавшим воркером."""
+        stale = timezone.now() - timedelta(
+            seconds=settings.TASKS_STALE_TIMEOUT
+        )
+        return Task.objects.filter(
+            status=Task.RUNNING, started__lt=stale
+        ).update(status=Task.PENDING)
+
+    def claim(self):
+        now = timezone.now()
+        candidates = Task.objects.filter(
+            status=Task.PENDING, run_after__lte=now
+        ).order_by('run_after', 'pk').values_list('pk', flat=True)
+        claimed = [
+            pk for pk in candidates[:self.batch_size]
+            if Task.objects.filter(pk=pk, status=Task.PENDING).update(
+                status=Task.RUNNING, started=now
+            )
+        ]
+        return list(Task.objects.filter(pk__in=claimed).order_by('pk'))
+
+    def _run(self, task):
+        try:
+            return run_task(task)
+        finally:
+            # У каждого потока свое соединение с базой
+            connection.close()
+
+    def run_once(self):
+        """Выполняет одну пачку задач и возвращает ее размер."""
+        tasks = self.claim()
+        list(self.executor.map(self._run, tasks))
+        return len(tasks)
+
+    def shutdown(self):
+        self.executor.shutdown()
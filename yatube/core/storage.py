@@ -0,0 +1,46 @@
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files.base import ContentFile
+
+from .compression import compressed_variants
+
+# Файлы, которые имеет смысл сжимать: картинки уже сжаты
+COMPRESSIBLE_EXTENSIONS = (
+    '.css', '.js', '.svg', '.txt', '.html', '.json', '.xml', '.ico', '.map'
+)
+# Расширения сжатых копий, которые отдает веб-сервер
+# (gzip_static и brotli_static в nginx)
+ENCODING_EXTENSIONS = {'gzip': '.gz', 'br': '.br'}
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Хранилище статики с хэшем содержимого в именах файлов.
+    collectstatic дополнительно кладет рядом с каждым таким файлом
+    сжатые копии .gz и .br, если они меньше исходного файла.
+    """
+    def post_process(self, paths, dry_run=False, **options):
+        hashed_names = set()
+        for name, hashed_name, processed in super().post_process(
+            paths, dry_run, **options
+        ):
+            if hashed_name and not isinstance(processed, Exception):
+                hashed_names.add(hashed_name)
+            yield name, hashed_name, processed
+        if dry_run:
+            return
+        for name in sorted(hashed_names):
+            if os.path.splitext(name)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+                self.compress_file(name)
+
+    def compress_file(self, name):
+        with self.open(name) as source:
+            variants = compressed_variants(source.read())
+        for encoding, extension in ENCODING_EXTENSIONS.items():
+            if encoding not in variants:
+                continue
+            compressed_name = name + extension
+            if self.exists(compressed_name):
+                self.delete(compressed_name)
+            self._save(compressed_name, ContentFile(variants[encoding]))
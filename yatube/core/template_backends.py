@@ -0,0 +1,47 @@
+import threading
+import time
+
+from django.template import TemplateDoesNotExist
+from django.template.backends.django import DjangoTemplates, Template, reraise
+
+# Время шаблонов копится в потоке, который обрабатывает запрос
+_local = threading.local()
+
+
+def start_template_timing():
+    _local.template_time = 0.0
+
+
+def stop_template_timing():
+    """Возвращает время шаблонов с начала замера и заканчивает замер."""
+    return _local.__dict__.pop('template_time', 0.0)
+
+
+class TimedTemplate(Template):
+    """Шаблон, который добавляет время отрисовки к замеру запроса."""
+    def render(self, context=None, request=None):
+        # Шаблоны, отрисованные внутри другого (например, тегами
+        # карточек), уже учтены во внешнем
+        depth = getattr(_local, 'depth', 0)
+        _local.depth = depth + 1
+        started = time.perf_counter()
+        try:
+            return super().render(context, request)
+        finally:
+            _local.depth = depth
+            if depth == 0 and hasattr(_local, 'template_time'):
+                _local.template_time += time.perf_counter() - started
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Шаблонизатор Django с замером времени отрисовки для метрик."""
+    def from_string(self, template_code):
+        return TimedTemplate(self.engine.from_string(template_code), self)
+
+    def get_template(self, template_name):
+        try:
+            return TimedTemplate(
+                self.engine.get_template(template_name), self
+            )
+        except TemplateDoesNotExist as exc:
+            reraise(exc, self)
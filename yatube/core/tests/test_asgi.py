@@ -0,0 +1,116 @@
+import asyncio
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import TransactionTestCase
+from django.urls import reverse
+
+from posts.models import Post
+from ..asgi import ThreadPoolASGIHandler
+
+User = get_user_model()
+
+
+class ThreadPoolASGIHandlerTest(TransactionTestCase):
+    """Проверяем обслуживание запросов через ASGI"""
+    def setUp(self):
+        cache.clear()
+        self.application = ThreadPoolASGIHandler(WSGIHandler(), threads=2)
+        self.addCleanup(self.application.executor.shutdown)
+        self.user = User.objects.create_user(username='testuser')
+        self.post = Post.objects.create(
+            author=self.user, text='Тестовый пост через ASGI'
+        )
+
+    def call(self, scope, incoming):
+        """Прогоняет приложение и возвращает отправленные им сообщения"""
+        incoming = list(incoming)
+        messages = []
+
+        async def receive():
+            return incoming.pop(0)
+
+        async def send(message):
+            messages.append(message)
+
+        loop = asyncio.new_event_loop()
+        try:
+            loop.run_until_complete(self.application(scope, receive, send))
+        finally:
+            loop.close()
+        return messages
+
+    def get(self, path, query_string=b''):
+        return self.call({
+            'type': 'http',
+            'method': 'GET',
+            'path': path,
+            'query_string': query_string,
+            'headers': [(b'host', b'localhost')],
+        }, [{'type': 'http.request', 'body': b''}])
+
+    def test_get_post_detail(self):
+        """Страница поста отдается со статусом, заголовками и телом"""
+        messages = self.get(reverse('posts:post_detail', args=(self.post.pk,)))
+        start = messages[0]
+        self.assertEqual(start['type'], 'http.response.start')
+        self.assertEqual(start['status'], 200)
+        self.assertIn(
+            (b'content-type', b'text/html; charset=utf-8'), start['headers']
+        )
+        body = b''.join(message['body'] for message in messages[1:])
+        self.assertIn(self.post.text.encode(), body)
+        self.assertFalse(messages[-1].get('more_body', False))
+
+    def test_query_string_passed_to_view(self):
+        """Параметры запроса доходят до view"""
+        messages = self.get(reverse('api:post_list'), b'limit=1')
+        self.assertEqual(messages[0]['status'], 200)
+        self.assertIn(b'"next"', messages[1]['body'])
+
+    def test_repeated_headers(self):
+        """Повторные Cookie склеиваются через точку с запятой"""
+        environ = self.application.build_environ({
+            'type': 'http',
+            'method': 'GET',
+            'path': '/',
+            'headers': [
+                (b'cookie', b'sessionid=abc'),
+                (b'cookie', b'csrftoken=xyz'),
+                (b'accept', b'text/html'),
+                (b'accept', b'application/json'),
+            ],
+        }, None)
+        self.assertEqual(
+            environ['HTTP_COOKIE'], 'sessionid=abc; csrftoken=xyz'
+        )
+        self.assertEqual(
+            environ['HTTP_ACCEPT'], 'text/html,application/json'
+        )
+
+    def test_missing_page(self):
+        """Несуществующий пост отдает 404"""
+        messages = self.get(reverse('posts:post_detail', args=(0,)))
+        self.assertEqual(messages[0]['status'], 404)
+
+    def test_disconnect_before_body(self):
+        """При обрыве соединения до тела запроса ответ не отправляется"""
+        messages = self.call({
+            'type': 'http',
+            'method': 'POST',
+            'path': reverse('posts:post_create'),
+            'headers': [(b'host', b'localhost')],
+        }, [{'type': 'http.disconnect'}])
+        self.assertEqual(messages, [])
+
+    def test_lifespan(self):
+        """Приложение подтверждает запуск и остановку"""
+        messages = self.call({'type': 'lifespan'}, [
+            {'type': 'lifespan.startup'},
+            {'type': 'lifespan.shutdown'},
+        ])
+        self.assertEqual(
+            [message['type'] for message in messages],
+            ['lifespan.startup.complete', 'lifespan.shutdown.complete']
+        )
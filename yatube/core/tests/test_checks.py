@@ -0,0 +1,87 @@
+from django.core.checks.registry import registry
+from django.test import SimpleTestCase, override_settings
+
+from ..checks import check_shared_cache, check_worker_cache
+
+LOCAL_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+}
+MIXED_CACHES = {
+    **LOCAL_CACHES,
+    'shared': {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': '127.0.0.1:11211',
+    },
+}
+SHARED_CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.memcached.MemcachedCache',
+        'LOCATION': '127.0.0.1:11211',
+    },
+}
+
+
+class SharedCacheCheckTest(SimpleTestCase):
+    """Проверяем предупреждения о кэше в памяти процесса"""
+    def ids(self):
+        return [message.id for message in check_shared_cache(None)]
+
+    def test_is_deploy_check(self):
+        """Предупреждения выводит только check --deploy"""
+        self.assertIn(check_shared_cache, registry.get_checks(
+            include_deployment_checks=True
+        ))
+        self.assertNotIn(check_shared_cache, registry.get_checks())
+
+    @override_settings(CACHES=LOCAL_CACHES)
+    def test_local_cache_in_production(self):
+        """Кэш в памяти процесса - предупреждение при проверке деплоя"""
+        self.assertEqual(self.ids(), ['core.W001', 'core.W002'])
+
+    @override_settings(CACHES=MIXED_CACHES, TIMELINE_CACHE='shared')
+    def test_timeline_in_shared_cache(self):
+        """Ленты в общем кэше не вызывают предупреждения о лентах"""
+        self.assertEqual(self.ids(), ['core.W001'])
+
+    @override_settings(CACHES=SHARED_CACHES)
+    def test_shared_cache(self):
+        """Общий кэш проверку проходит"""
+        self.assertEqual(self.ids(), [])
+
+
+class WorkerCacheCheckTest(SimpleTestCase):
+    """Проверяем требование общего кэша для воркера очереди"""
+    def ids(self):
+        return [message.id for message in check_worker_cache(None)]
+
+    def test_is_deploy_check(self):
+        """Ошибку выводит только check --deploy"""
+        self.assertIn(check_worker_cache, registry.get_checks(
+            include_deployment_checks=True
+        ))
+        self.assertNotIn(check_worker_cache, registry.get_checks())
+
+    @override_settings(
+        TASKS_EAGER=False, CACHES=MIXED_CACHES,
+        TIMELINE_CACHE='shared', POST_CARD_CACHE='shared'
+    )
+    def test_worker_with_local_cache(self):
+        """Воркер при кэше страниц в памяти процесса - ошибка"""
+        messages = check_worker_cache(None)
+        self.assertEqual([message.id for message in messages], ['core.E001'])
+        self.assertIn('default', messages[0].msg)
+
+    @override_settings(TASKS_EAGER=True, CACHES=LOCAL_CACHES)
+    def test_eager_tasks_with_local_cache(self):
+        """Задачи в процессе сайта работают и с кэшем в памяти"""
+        self.assertEqual(self.ids(), [])
+
+    @override_settings(
+        TASKS_EAGER=False, CACHES=SHARED_CACHES,
+        TIMELINE_CACHE='default', POST_CARD_CACHE='default'
+    )
+    def test_worker_with_shared_cache(self):
+        """Воркер с общим кэшем проверку проходит"""
+        self.assertEqual(self.ids(), [])
@@ -0,0 +1,100 @@
+import gzip
+import os
+import tempfile
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from ..compression import choose_encoding
+
+User = get_user_model()
+
+
+class CompressionMiddlewareTest(TestCase):
+    """Проверяем сжатие HTML-страниц постов"""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='testuser')
+        cls.guest_client = Client()
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def test_index_compressed_for_gzip_client(self):
+        """Главная сжимается gzip, если клиент его принимает"""
+        plain = self.guest_client.get(reverse('posts:index'))
+        self.assertFalse(plain.has_header('Content-Encoding'))
+        self.assertIn('Accept-Encoding', plain['Vary'])
+        response = self.guest_client.get(
+            reverse('posts:index'), HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertTrue(response['ETag'].startswith('W/'))
+        self.assertEqual(gzip.decompress(response.content), plain.content)
+
+    def test_weak_etag_answered_with_not_modified(self):
+        """Слабый ETag сжатой страницы подходит для ответа 304"""
+        response = self.guest_client.get(
+            reverse('posts:index'), HTTP_ACCEPT_ENCODING='gzip'
+        )
+        response = self.guest_client.get(
+            reverse('posts:index'), HTTP_ACCEPT_ENCODING='gzip',
+            HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_page_with_csrf_token_not_compressed(self):
+        """Страница с формой и CSRF-токеном не сжимается"""
+        response = self.authorized_client.get(
+            reverse('posts:post_create'), HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+    def test_choose_encoding_prefers_available(self):
+        """Выбирается лучшая кодировка из доступных и принимаемых"""
+        available = ('gzip', 'identity')
+        request = RequestFactory().get(
+            '/', HTTP_ACCEPT_ENCODING='br, gzip;q=0.5'
+        )
+        self.assertEqual(choose_encoding(request, available), 'gzip')
+        request = RequestFactory().get('/', HTTP_ACCEPT_ENCODING='gzip;q=0')
+        self.assertEqual(choose_encoding(request, available), 'identity')
+
+
+class CompressedStaticStorageTest(TestCase):
+    """Проверяем сбор статики с хэшами и сжатыми копиями"""
+    def test_collectstatic_writes_compressed_copies(self):
+        with tempfile.TemporaryDirectory() as static_root:
+            with override_settings(
+                STATIC_ROOT=static_root,
+                STATICFILES_STORAGE=(
+                    'core.storage.CompressedManifestStaticFilesStorage'
+                )
+            ):
+                call_command(
+                    'collectstatic', interactive=False, stdout=StringIO()
+                )
+            css_dir = os.path.join(static_root, 'css')
+            names = os.listdir(css_dir)
+            hashed = [
+                name for name in names
+                if name.startswith('bootstrap.min.')
+                and name.endswith('.css') and name != 'bootstrap.min.css'
+            ]
+            self.assertEqual(len(hashed), 1)
+            self.assertIn(hashed[0] + '.gz', names)
+            with open(os.path.join(css_dir, hashed[0]), 'rb') as source:
+                content = source.read()
+            with open(os.path.join(css_dir, hashed[0] + '.gz'), 'rb') as gz:
+                self.assertEqual(gzip.decompress(gz.read()), content)
+            self.assertFalse([
+                name for name in os.listdir(os.path.join(static_root, 'img'))
+                if name.endswith('.gz')
+            ])
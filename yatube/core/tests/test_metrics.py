@@ -0,0 +1,74 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from ..metrics import HISTOGRAMS
+
+User = get_user_model()
+
+
+class MetricsTest(TestCase):
+    """Проверяем замеры запросов и страницу метрик"""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.guest_client = Client()
+        cls.staff_client = Client()
+        cls.staff_client.force_login(
+            User.objects.create_user(username='staff', is_staff=True)
+        )
+        cls.metrics_url = reverse('metrics')
+
+    def setUp(self):
+        for histogram in HISTOGRAMS:
+            histogram.reset()
+
+    def test_response_has_server_timing_header(self):
+        """Проверяем заголовок Server-Timing"""
+        response = self.guest_client.get(reverse('about:author'))
+        for metric in ('db;dur=', 'tpl;dur=', 'total;dur='):
+            with self.subTest(metric=metric):
+                self.assertIn(metric, response['Server-Timing'])
+
+    def test_metrics_page_shows_histograms_by_view(self):
+        """Проверяем, что метрики собираются по view"""
+        self.guest_client.get(reverse('posts:index'))
+        response = self.staff_client.get(self.metrics_url)
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        for line in (
+            'yatube_request_duration_seconds_count{view="posts:index"} 1',
+            'yatube_db_queries_count{view="posts:index"} 1',
+            'yatube_template_duration_seconds_bucket{view="posts:index",',
+            '# TYPE yatube_page_cache_total counter',
+        ):
+            with self.subTest(line=line):
+                self.assertContains(response, line)
+
+    def test_template_time_is_measured(self):
+        """Проверяем, что время шаблонов замеряет шаблонизатор"""
+        response = self.guest_client.get(reverse('posts:search'))
+        template_time = float(
+            response['Server-Timing'].split('tpl;dur=')[1].split(',')[0]
+        )
+        self.assertGreater(template_time, 0)
+
+    def test_metrics_page_is_forbidden_without_access(self):
+        """Проверяем, что метрики недоступны гостям, даже с 127.0.0.1"""
+        response = self.guest_client.get(
+            self.metrics_url, REMOTE_ADDR='127.0.0.1'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
+
+    @override_settings(METRICS_TOKEN='secret')
+    def test_metrics_page_is_available_by_token(self):
+        """Проверяем доступ к метрикам по токену"""
+        response = self.guest_client.get(
+            self.metrics_url, HTTP_AUTHORIZATION='Bearer secret'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+        response = self.guest_client.get(
+            self.metrics_url, HTTP_AUTHORIZATION='Bearer wrong'
+        )
+        self.assertEqual(response.status_code, HTTPStatus.FORBIDDEN)
@@ -0,0 +1,75 @@
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, Client, override_settings
+from django.urls import reverse
+
+from ..queries import fingerprint, load_query_stats, query_stats
+
+
+class QueryStatsTest(TestCase):
+    """Проверяем статистику SQL-запросов по отпечаткам"""
+    def setUp(self):
+        query_stats.reset()
+        self.stats_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.stats_dir.cleanup)
+
+    def test_fingerprint_hides_values(self):
+        """Проверяем, что отпечаток не зависит от значений"""
+        queries = (
+            'SELECT * FROM "posts_post" WHERE "id" IN (%s, %s, %s) LIMIT 21',
+            'SELECT  *  FROM "posts_post" WHERE "id" IN (%s) LIMIT 10',
+            "SELECT * FROM \"posts_post\" WHERE \"id\" IN (7) LIMIT 1",
+        )
+        expected = 'SELECT * FROM "posts_post" WHERE "id" IN (...) LIMIT ?'
+        for sql in queries:
+            with self.subTest(sql=sql):
+                self.assertEqual(fingerprint(sql), expected)
+
+    @override_settings(SLOW_QUERY_THRESHOLD_MS=0)
+    def test_slow_queries_are_logged_with_view(self):
+        """Проверяем запись медленных запросов в лог"""
+        with self.assertLogs('yatube.slow_queries', 'WARNING') as logs:
+            Client().get(reverse('posts:index'))
+        self.assertIn('posts:index', logs.output[0])
+
+    def test_command_shows_top_queries(self):
+        """Проверяем, что команда выводит собранную статистику"""
+        with override_settings(QUERY_STATS_DIR=self.stats_dir.name):
+            Client().get(reverse('posts:index'))
+            query_stats.flush()
+            rows = load_query_stats()
+            out = StringIO()
+            call_command('query_stats', top=1, stdout=out)
+        self.assertTrue(rows)
+        self.assertEqual(rows[0]['top_view'], 'posts:index')
+        self.assertIn('posts:index', out.getvalue())
+
+    def test_concurrent_flushes_write_one_file(self):
+        """Проверяем, что одновременный сброс из потоков не падает"""
+        query_stats.record('SELECT 1', 0.001, 'posts:index')
+        with override_settings(QUERY_STATS_DIR=self.stats_dir.name):
+            with ThreadPoolExecutor(8) as executor:
+                for future in [
+                    executor.submit(query_stats.flush) for _ in range(200)
+                ]:
+                    future.result()
+            rows = load_query_stats()
+        self.assertEqual(os.listdir(self.stats_dir.name), [
+            f'{os.getpid()}.json'
+        ])
+        self.assertEqual(rows[0]['count'], 1)
+
+    def test_flush_errors_do_not_reach_queries(self):
+        """Проверяем, что ошибка записи статистики не ломает запрос"""
+        not_a_directory = os.path.join(self.stats_dir.name, 'file')
+        open(not_a_directory, 'w').close()
+        with override_settings(
+            QUERY_STATS_DIR=not_a_directory, QUERY_STATS_FLUSH_INTERVAL=0
+        ):
+            with self.assertLogs('yatube.slow_queries', 'ERROR'):
+                response = Client().get(reverse('posts:index'))
+        self.assertEqual(response.status_code, 200)
@@ -0,0 +1,127 @@
+import json
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.utils import timezone
+
+from posts.models import Post
+from posts.search import search_posts
+from ..models import Task
+from ..queue import Worker, enqueue, run_task, task
+
+User = get_user_model()
+
+calls = []
+
+
+@task
+def remember(value):
+    calls.append(value)
+
+
+@task
+def explode():
+    raise ValueError('ошибка задачи')
+
+
+@override_settings(TASKS_EAGER=False)
+class TaskQueueTest(TestCase):
+    """Проверяем очередь фоновых задач"""
+    def setUp(self):
+        calls.clear()
+
+    def test_delay_stores_task_in_queue(self):
+        """Задача записывается в очередь и выполняется воркером"""
+        remember.delay('значение')
+        self.assertEqual(calls, [])
+        queued = Task.objects.get()
+        self.assertEqual(queued.name, remember.task_name)
+        self.assertEqual(json.loads(queued.args), ['значение'])
+        self.assertEqual(Worker(threads=1).claim(), [queued])
+        self.assertEqual(Task.objects.get().status, Task.RUNNING)
+        self.assertTrue(run_task(queued))
+        self.assertEqual(calls, ['значение'])
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(TASKS_EAGER=True)
+    def test_eager_mode_runs_task_at_once(self):
+        """В режиме TASKS_EAGER задача выполняется сразу"""
+        enqueue(remember.task_name, 1)
+        self.assertEqual(calls, [1])
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(TASKS_MAX_ATTEMPTS=2)
+    def test_failed_task_is_retried_then_kept(self):
+        """Упавшая задача откладывается, а после всех попыток остается"""
+        failing = explode.delay()
+        with self.assertLogs('yatube.tasks', 'ERROR'):
+            self.assertFalse(run_task(failing))
+            failing.refresh_from_db()
+            self.assertEqual(failing.status, Task.PENDING)
+            self.assertGreater(failing.run_after, timezone.now())
+            self.assertEqual(Worker(threads=1).claim(), [])
+            self.assertFalse(run_task(failing))
+        failing.refresh_from_db()
+        self.assertEqual(failing.status, Task.FAILED)
+        self.assertIn('ошибка задачи', failing.error)
+
+    def test_failed_save_does_not_stop_worker(self):
+        """Ошибка при сохранении упавшей задачи не выходит из run_task"""
+        failing = explode.delay()
+        with mock.patch.object(Task, 'save', side_effect=DatabaseError):
+            with self.assertLogs('yatube.tasks', 'ERROR') as logs:
+                self.assertFalse(run_task(failing))
+        self.assertIn('Не удалось сохранить', logs.output[0])
+
+    def test_post_side_effects_are_queued(self):
+        """Индексация и раскладка по лентам нового поста идут через очередь"""
+        user = User.objects.create_user(username='testuser')
+        Post.objects.create(author=user, text='Отложенная индексация')
+        self.assertEqual(
+            set(Task.objects.values_list('name', flat=True)),
+            {'posts.tasks.index_post', 'posts.tasks.fan_out'}
+        )
+
+
+@override_settings(TASKS_EAGER=False)
+class RunWorkerCommandTest(TransactionTestCase):
+    """Проверяем, что команда run_worker разбирает очередь пулом потоков"""
+    def test_worker_runs_queued_tasks(self):
+        user = User.objects.create_user(username='testuser')
+        Post.objects.create(author=user, text='Отложенная индексация')
+        self.assertEqual(search_posts('индексации').count(), 0)
+        out = StringIO()
+        call_command('run_worker', once=True, threads=2, stdout=out)
+        self.assertIn('Обработано задач: 2', out.getvalue())
+        self.assertFalse(Task.objects.exists())
+        self.assertEqual(search_posts('индексации').count(), 1)
+        Post.objects.all().delete()
+
+    @override_settings(TASKS_STALE_TIMEOUT=0)
+    def test_worker_requeues_stale_tasks_while_running(self):
+        """Задачи упавшего воркера возвращаются в очередь без перезапуска"""
+        calls.clear()
+        sleeps = []
+
+        def sleep(seconds):
+            # Пока воркер ждет, другой воркер падает с захваченной задачей
+            sleeps.append(seconds)
+            if len(sleeps) > 1:
+                raise KeyboardInterrupt
+            Task.objects.create(
+                name=remember.task_name, args='["брошенная"]',
+                status=Task.RUNNING,
+                started=timezone.now() - timedelta(hours=1)
+            )
+
+        out = StringIO()
+        with mock.patch('time.sleep', sleep):
+            call_command('run_worker', threads=1, stdout=out)
+        self.assertEqual(calls, ['брошенная'])
+        self.assertIn('Возвращено в очередь задач: 1', out.getvalue())
+        self.assertFalse(Task.objects.exists())
@@ -1,9 +1,219 @@
-from django.core.paginator import Paginator
+import base64
+import hashlib
 
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import EmptyResultSet
+from django.core.paginator import Page, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
 
-def pagination(request, post_list, items_num):
+from .cache import cache_generation, rotate_after_commit
+
+# Направления перехода по курсору
+CURSOR_NEXT = 'n'
+CURSOR_PREVIOUS = 'p'
+
+
+def invalidate_counts():
+    """
+    Делает недействительными все закэшированные подсчеты записей,
+    в том числе сохраненные до фиксации текущей транзакции.
+    """
+    rotate_after_commit('count')
+
+
+def approximate_count(queryset):
+    """
+    Оценивает число строк таблицы по статистике СУБД.
+    Возвращает None, если оценки нет или запрос отфильтрован.
+    """
+    if queryset.query.where:
+        return None
+    table = queryset.model._meta.db_table
+    connection = connections[queryset.db]
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute(
+                'SELECT reltuples::bigint FROM pg_class '
+                'WHERE oid = %s::regclass', [table]
+            )
+        elif connection.vendor == 'sqlite':
+            cursor.execute(
+                "SELECT name FROM sqlite_master "
+                "WHERE type = 'table' AND name = 'sqlite_stat1'"
+            )
+            if cursor.fetchone() is None:
+                return None
+            cursor.execute(
+                'SELECT stat FROM sqlite_stat1 WHERE tbl = %s', [table]
+            )
+        else:
+            return None
+        row = cursor.fetchone()
+    if row is None:
+        return None
+    estimate = int(str(row[0]).split()[0])
+    if estimate < settings.PAGINATION_APPROXIMATE_COUNT_MIN:
+        return None
+    return estimate
+
+
+def cached_count(queryset):
+    """
+    Считает записи в queryset, сохраняя результат в кэше
+    до ближайшей инвалидации.
+    """
+    # Сортировка и подгрузка связей не влияют на количество записей
+    try:
+        sql, params = queryset.order_by().values('pk').query.sql_with_params()
+    except EmptyResultSet:
+        # Заведомо пустая выборка, например queryset.none()
+        return 0
+    raw = f'{queryset.db}|{sql}|{params}'
+    digest = hashlib.md5(raw.encode()).hexdigest()
+    key = f'count:{cache_generation("count")}:{digest}'
+    count = cache.get(key)
+    if count is None:
+        if settings.PAGINATION_APPROXIMATE_COUNT:
+            count = approximate_count(queryset)
+        if count is None:
+            count = queryset.count()
+        cache.set(key, count, settings.PAGINATION_COUNT_TIMEOUT)
+    return count
+
+
+class CountingPaginator(Paginator):
+    """Паджинатор, берущий общее число записей из кэша подсчетов."""
+    @cached_property
+    def count(self):
+        if not hasattr(self.object_list, 'query'):
+            return super().count
+        return cached_count(self.object_list)
+
+
+def encode_cursor(obj, direction):
+    """Упаковывает позицию записи (pub_date, id) в непрозрачный токен."""
+    raw = f'{direction}|{obj.pub_date.isoformat()}|{obj.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Распаковывает токен курсора, для битого токена возвращает None."""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        direction, pub_date, pk = raw.decode().split('|')
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except ValueError:
+        return None
+    if direction not in (CURSOR_NEXT, CURSOR_PREVIOUS) or pub_date is None:
+        return None
+    return direction, pub_date, pk
+
+
+class CursorPage(Page):
+    """
+    Страница, которая помимо номера знает курсоры соседних страниц.
+    В режиме курсора номер страницы и общее число записей не вычисляются.
+    """
+    def __init__(self, object_list, number, paginator,
+                 has_next=None, has_previous=None):
+        super().__init__(object_list, number, paginator)
+        self.is_cursor = has_next is not None
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def has_next(self):
+        if self.is_cursor:
+            return self._has_next
+        return super().has_next()
+
+    def has_previous(self):
+        if self.is_cursor:
+            return self._has_previous
+        return super().has_previous()
+
+    @property
+    def next_cursor(self):
+        if not self.has_next():
+            return None
+        return encode_cursor(self[len(self) - 1], CURSOR_NEXT)
+
+    @property
+    def previous_cursor(self):
+        if not self.has_previous():
+            return None
+        return encode_cursor(self[0], CURSOR_PREVIOUS)
+
+
+class CursorPaginator(CountingPaginator):
+    """
+    Паджинатор с keyset-режимом: страница по курсору выбирается условием
+    по (pub_date, id) вместо OFFSET и не требует COUNT(*).
+    """
+    def __init__(self, object_list, per_page, **kwargs):
+        super().__init__(
+            object_list.order_by('-pub_date', '-pk'), per_page, **kwargs
+        )
+
+    def _get_page(self, *args, **kwargs):
+        return CursorPage(*args, **kwargs)
+
+    def _cursor_page(self, rows, has_next, has_previous):
+        return CursorPage(
+            rows, None, self, has_next=has_next, has_previous=has_previous
+        )
+
+    def get_first_cursor_page(self):
+        rows = list(self.object_list[:self.per_page + 1])
+        return self._cursor_page(
+            rows[:self.per_page], len(rows) > self.per_page, False
+        )
+
+    def get_cursor_page(self, token):
+        cursor = decode_cursor(token)
+        if cursor is None:
+            return self.get_first_cursor_page()
+        direction, pub_date, pk = cursor
+        if direction == CURSOR_NEXT:
+            rows = self.object_list.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, pk__lt=pk)
+            )
+        else:
+            rows = self.object_list.filter(
+                Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, pk__gt=pk)
+            ).order_by('pub_date', 'pk')
+        rows = list(rows[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == CURSOR_PREVIOUS:
+            if not has_more:
+                # Дошли до начала ленты - отдаем первую полную страницу
+                return self.get_first_cursor_page()
+            rows.reverse()
+            return self._cursor_page(rows, True, True)
+        if not rows:
+            return self.get_first_cursor_page()
+        return self._cursor_page(rows, has_more, True)
+
+
+def pagination(request, post_list, items_num, keyset=False, count=None,
+               paginator_class=None):
     # Показывать по items_num записей на странице.
-    paginator = Paginator(post_list, items_num)
+    if paginator_class is None:
+        paginator_class = CursorPaginator if keyset else CountingPaginator
+    paginator = paginator_class(post_list, items_num)
+    if count is not None:
+        # Общее число записей уже известно, например из счетчика
+        paginator.count = count
+    if keyset:
+        # Курсор из URL имеет приоритет над номером страницы
+        cursor = request.GET.get('cursor')
+        if cursor is not None:
+            return paginator.get_cursor_page(cursor)
     # Из URL извлекаем номер запрошенной страницы - это значение параметра page
     page_number = request.GET.get('page')
     # Получаем набор записей для страницы с запрошенным номером
@@ -0,0 +1,36 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseForbidden
+from django.utils.crypto import constant_time_compare
+
+from .cache import page_cache_stats
+from .metrics import render_metrics
+
+
+def metrics_allowed(request):
+    """
+    Метрики доступны по токену METRICS_TOKEN или персоналу. Адрес
+    клиента не проверяется: за прокси все запросы приходят с 127.0.0.1.
+    """
+    token = settings.METRICS_TOKEN
+    if token and constant_time_compare(
+        request.META.get('HTTP_AUTHORIZATION', ''), f'Bearer {token}'
+    ):
+        return True
+    return request.user.is_active and request.user.is_staff
+
+
+def metrics(request):
+    """Отдает метрики процесса в текстовом формате Prometheus."""
+    if not metrics_allowed(request):
+        return HttpResponseForbidden()
+    counters = (
+        (
+            'yatube_page_cache_total',
+            'Попадания и промахи кэша страниц',
+            dict(page_cache_stats)
+        ),
+    )
+    return HttpResponse(
+        render_metrics(counters),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
@@ -18,7 +18,7 @@ class PostAdmin(admin.ModelAdmin):
 
 
 class GroupAdmin(admin.ModelAdmin):
-    list_display = ('pk', 'title', 'description')
+    list_display = ('pk', 'title', 'description', 'posts_count')
     search_fields = ('title',)
 
 
@@ -0,0 +1,97 @@
+from datetime import MAXYEAR, MINYEAR, datetime
+
+from django.db import transaction
+from django.db.models import Count, DateField, F
+from django.db.models.functions import Greatest, TruncMonth
+from django.utils import timezone
+
+from .models import Post, PostMonth
+
+# Область сводки по всем постам
+ARCHIVE_ALL = 'all'
+
+
+def archive_scope(group_id=None, author_id=None):
+    """Область сводки: все посты, посты группы или посты автора."""
+    if group_id is not None:
+        return f'group:{group_id}'
+    if author_id is not None:
+        return f'author:{author_id}'
+    return ARCHIVE_ALL
+
+
+def post_scopes(author_id, group_id):
+    """Области сводки, в которые входит пост."""
+    scopes = [ARCHIVE_ALL, archive_scope(author_id=author_id)]
+    if group_id is not None:
+        scopes.append(archive_scope(group_id=group_id))
+    return scopes
+
+
+def month_of(pub_date):
+    """Первый день месяца публикации в текущем часовом поясе."""
+    return timezone.localtime(pub_date).date().replace(day=1)
+
+
+def is_valid_month(year, month):
+    return 1 <= month <= 12 and MINYEAR <= year < MAXYEAR
+
+
+def month_range(year, month):
+    """
+    Границы месяца [начало, начало следующего) для выборки
+    по индексу даты публикации.
+    """
+    next_year, next_month = divmod(year * 12 + month, 12)
+    return (
+        timezone.make_aware(datetime(year, month, 1)),
+        timezone.make_aware(datetime(next_year, next_month + 1, 1)),
+    )
+
+
+def change_archive_month(scopes, month, delta):
+    """Изменяет на delta число постов месяца в областях сводки."""
+    for scope in scopes:
+        if delta > 0:
+            PostMonth.objects.get_or_create(scope=scope, month=month)
+        PostMonth.objects.filter(scope=scope, month=month).update(
+            posts_count=Greatest(F('posts_count') + delta, 0)
+        )
+
+
+def archive_months(scope):
+    """Непустые месяцы области для навигации по архиву, новые сначала."""
+    return PostMonth.objects.filter(
+        scope=scope, posts_count__gt=0
+    ).order_by('-month')
+
+
+@transaction.atomic
+def rebuild_archive():
+    """Пересчитывает сводку по месяцам для всех областей."""
+    PostMonth.objects.all().delete()
+    months = Post.objects.annotate(
+        month=TruncMonth('pub_date', output_field=DateField())
+    ).order_by()
+    rows = [
+        (ARCHIVE_ALL, month, posts_count)
+        for month, posts_count in months.values_list('month').annotate(
+            Count('pk')
+        )
+    ]
+    rows += [
+        (archive_scope(group_id=group_id), month, posts_count)
+        for group_id, month, posts_count in months.exclude(
+            group=None
+        ).values_list('group', 'month').annotate(Count('pk'))
+    ]
+    rows += [
+        (archive_scope(author_id=author_id), month, posts_count)
+        for author_id, month, posts_count in months.values_list(
+            'author', 'month'
+        ).annotate(Count('pk'))
+    ]
+    PostMonth.objects.bulk_create(
+        PostMonth(scope=scope, month=month, posts_count=posts_count)
+        for scope, month, posts_count in rows
+    )
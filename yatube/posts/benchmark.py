@@ -0,0 +1,229 @@
+import os
+import platform
+import random
+import statistics
+import time
+import tracemalloc
+from datetime import timedelta
+
+import django
+from django.conf import settings
+from django.contrib.staticfiles.finders import get_finders
+from django.core.cache import caches
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from faker import Faker
+
+from core.compression import available_encodings, compressed_variants
+from core.storage import COMPRESSIBLE_EXTENSIONS
+from core.utils import CURSOR_NEXT, encode_cursor
+from .bulk import preserve_pub_date, refresh_after_bulk_write
+from .models import Group, Post, User
+from .views import NUMBER_OF_ITEMS
+
+BATCH_SIZE = 5000
+# Размер набора заранее сгенерированных текстов постов
+TEXTS_POOL_SIZE = 1000
+BENCH_USERNAME = 'bench_user_{}'
+BENCH_SLUG = 'bench-group-{}'
+
+
+def seed(posts, users, groups, seed=0):
+    """
+    Заполняет базу пользователями, группами и постами.
+    Даты публикации идут по минуте, генерация воспроизводима по seed.
+    """
+    fake = Faker('ru_RU')
+    fake.seed_instance(seed)
+    rand = random.Random(seed)
+    User.objects.bulk_create(
+        User(
+            username=BENCH_USERNAME.format(i),
+            first_name=fake.first_name(),
+            last_name=fake.last_name()
+        )
+        for i in range(users)
+    )
+    Group.objects.bulk_create(
+        Group(
+            title=fake.sentence(nb_words=3)[:200],
+            slug=BENCH_SLUG.format(i),
+            description=fake.text(max_nb_chars=200)
+        )
+        for i in range(groups)
+    )
+    user_ids = list(User.objects.filter(
+        username__startswith=BENCH_USERNAME.format('')
+    ).values_list('pk', flat=True))
+    group_ids = list(Group.objects.filter(
+        slug__startswith=BENCH_SLUG.format('')
+    ).values_list('pk', flat=True)) + [None]
+    texts = [fake.text(max_nb_chars=400) for _ in range(TEXTS_POOL_SIZE)]
+    start = timezone.now() - timedelta(minutes=posts)
+    with preserve_pub_date():
+        for offset in range(0, posts, BATCH_SIZE):
+            Post.objects.bulk_create([
+                Post(
+                    text=rand.choice(texts),
+                    author_id=rand.choice(user_ids),
+                    group_id=rand.choice(group_ids),
+                    pub_date=start + timedelta(minutes=i)
+                )
+                for i in range(offset, min(offset + BATCH_SIZE, posts))
+            ])
+    refresh_after_bulk_write()
+
+
+def clear_caches():
+    for alias in settings.CACHES:
+        caches[alias].clear()
+
+
+def _percentile(values, percent):
+    values = sorted(values)
+    return values[round(percent / 100 * (len(values) - 1))]
+
+
+def measure(make_request, repeat, cold=True):
+    """
+    Выполняет запрос repeat раз и возвращает задержку, число
+    SQL-запросов и пик памяти. cold=True сбрасывает кэши перед
+    каждым запросом.
+    """
+    latencies = []
+    queries = []
+    for _ in range(repeat):
+        if cold:
+            clear_caches()
+        with CaptureQueriesContext(connection) as context:
+            started = time.perf_counter()
+            response = make_request()
+            latencies.append((time.perf_counter() - started) * 1000)
+        queries.append(len(context.captured_queries))
+    # Память меряем отдельным прогоном: tracemalloc замедляет запросы
+    if cold:
+        clear_caches()
+    tracemalloc.start()
+    make_request()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        'status': response.status_code,
+        'bytes': len(response.content),
+        'latency_ms': {
+            'median': round(statistics.median(latencies), 3),
+            'p95': round(_percentile(latencies, 95), 3),
+            'max': round(max(latencies), 3),
+        },
+        'queries': max(queries),
+        'peak_memory_kb': round(peak / 1024, 1),
+    }
+
+
+def benchmark_cases():
+    """Возвращает запросы, которые меряет бенчмарк."""
+    guest = Client()
+    author = User.objects.order_by('-post_stats__posts_count').first()
+    group = Group.objects.order_by('-posts_count').first()
+    post = Post.objects.order_by('-pub_date', '-pk').first()
+    feed = Post.objects.order_by('-pub_date', '-pk')
+    total = feed.count()
+    last_page = max((total - 1) // NUMBER_OF_ITEMS + 1, 1)
+    deep_post = feed[max(total - NUMBER_OF_ITEMS - 1, 0)]
+    index = reverse('posts:index')
+    cases = {
+        'index': lambda **headers: guest.get(index, **headers),
+        'group_posts': lambda **headers: guest.get(
+            reverse('posts:group_list', args=(group.slug,)), **headers
+        ),
+        'profile': lambda **headers: guest.get(
+            reverse('posts:profile', args=(author.username,)), **headers
+        ),
+        'post_detail': lambda **headers: guest.get(
+            reverse('posts:post_detail', args=(post.pk,)), **headers
+        ),
+        'deep_page_offset': lambda **headers: guest.get(
+            index, {'page': last_page}, **headers
+        ),
+        'deep_page_cursor': lambda **headers: guest.get(
+            index, {'cursor': encode_cursor(deep_post, CURSOR_NEXT)},
+            **headers
+        ),
+        # Те же данные через JSON API - для сравнения с HTML
+        'api_posts': lambda **headers: guest.get(
+            reverse('api:post_list'), {'limit': NUMBER_OF_ITEMS}, **headers
+        ),
+        'api_group_posts': lambda **headers: guest.get(
+            reverse('api:group_posts', args=(group.slug,)),
+            {'limit': NUMBER_OF_ITEMS}, **headers
+        ),
+        'api_profile_posts': lambda **headers: guest.get(
+            reverse('api:profile_posts', args=(author.username,)),
+            {'limit': NUMBER_OF_ITEMS}, **headers
+        ),
+        'api_post_detail': lambda **headers: guest.get(
+            reverse('api:post_detail', args=(post.pk,)), **headers
+        ),
+    }
+    return cases, author
+
+
+def wire_bytes(make_request):
+    """Размер тела ответа для каждой кодировки, которую умеет сервер."""
+    return {
+        encoding: len(make_request(HTTP_ACCEPT_ENCODING=encoding).content)
+        for encoding in available_encodings()
+    }
+
+
+def static_wire_bytes():
+    """
+    Размер статики без сжатия и в сжатых копиях,
+    которые collectstatic кладет рядом с файлами.
+    """
+    sizes = {}
+    for finder in get_finders():
+        for path, storage in finder.list(['CVS', '.*', '*~']):
+            if os.path.splitext(path)[1].lower() in COMPRESSIBLE_EXTENSIONS:
+                with storage.open(path) as source:
+                    variants = compressed_variants(source.read())
+                sizes[path] = {
+                    encoding: len(data) for encoding, data in variants.items()
+                }
+    return sizes
+
+
+def run_benchmarks(repeat=10):
+    """
+    Меряет страницы постов и создание поста, возвращает отчет
+    вместе с размерами страниц и статики на проводе по кодировкам.
+    """
+    meta = {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'database': connection.vendor,
+        'posts': Post.objects.count(),
+        'users': User.objects.count(),
+        'groups': Group.objects.count(),
+        'repeat': repeat,
+    }
+    cases, author = benchmark_cases()
+    results = {}
+    for name, make_request in cases.items():
+        results[name] = {
+            'cold': measure(make_request, repeat),
+            'warm': measure(make_request, repeat, cold=False),
+            'wire_bytes': wire_bytes(make_request),
+        }
+    writer = Client()
+    writer.force_login(author)
+    create = reverse('posts:post_create')
+    results['post_create'] = {'cold': measure(
+        lambda: writer.post(create, {'text': 'Пост из бенчмарка'}), repeat
+    )}
+    return {
+        'meta': meta, 'results': results, 'static': static_wire_bytes()
+    }
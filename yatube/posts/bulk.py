@@ -0,0 +1,247 @@
+import csv
+import json
+from collections import Counter
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from core.cache import invalidate_all_pages
+from core.utils import invalidate_counts
+from .archive import (
+    change_archive_month, month_of, post_scopes, rebuild_archive
+)
+from .counters import (
+    activity_hour, activity_since, change_author_activity,
+    change_author_count, change_group_activity, change_group_count,
+    rebuild_activity, rebuild_post_counters
+)
+from .models import Group, Post, User
+from .search import index_posts, rebuild_search_index
+from .timeline import invalidate_timelines
+
+
+@contextmanager
+def preserve_pub_date():
+    """
+    Отключает auto_now_add у даты публикации, чтобы bulk_create
+    сохранил даты из исходных данных.
+    """
+    field = Post._meta.get_field('pub_date')
+    field.auto_now_add = False
+    try:
+        yield
+    finally:
+        field.auto_now_add = True
+
+
+def refresh_after_bulk_write():
+    """
+    bulk_create не вызывает сигналы, поэтому после массовой записи
+    пересчитываем счетчики, корзины активности, сводку архива,
+    поисковый индекс и сбрасываем кэши и ленты.
+    """
+    rebuild_post_counters()
+    rebuild_activity()
+    rebuild_archive()
+    rebuild_search_index()
+    invalidate_counts()
+    invalidate_all_pages()
+    invalidate_timelines()
+
+
+# Поля записи импорта: в JSONL каждое - строка или null
+IMPORT_FIELDS = ('text', 'author', 'group', 'pub_date')
+
+
+def is_valid_row(row):
+    return isinstance(row, dict) and all(
+        isinstance(row.get(field), (str, type(None)))
+        for field in IMPORT_FIELDS
+    )
+
+
+def read_rows(stream, file_format):
+    """
+    Построчно читает записи из JSONL или CSV.
+    Для строк, которые не удалось разобрать или в которых поля
+    не строки, возвращает None.
+    """
+    if file_format == 'csv':
+        yield from csv.DictReader(stream)
+        return
+    for line in stream:
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError:
+            row = None
+        yield row if is_valid_row(row) else None
+
+
+class PostImporter:
+    """
+    Импортирует посты пачками через bulk_create.
+    Авторы и группы ищутся по username и slug через словари в памяти,
+    счетчики и поисковый индекс обновляются вместе с каждой пачкой.
+    """
+    def __init__(self, batch_size=1000, create_missing=False):
+        self.batch_size = batch_size
+        self.create_missing = create_missing
+        self.authors = {}
+        self.groups = {}
+        self.imported = 0
+        self.skipped = 0
+
+    def run(self, rows, progress=None):
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == self.batch_size:
+                self.write_batch(batch)
+                batch = []
+                if progress is not None:
+                    progress(self)
+        if batch:
+            self.write_batch(batch)
+        invalidate_counts()
+        invalidate_all_pages()
+        invalidate_timelines()
+
+    def _resolve_authors(self, usernames):
+        missing = usernames - self.authors.keys()
+        if missing and self.create_missing:
+            existing = set(User.objects.filter(
+                username__in=missing
+            ).values_list('username', flat=True))
+            users = [User(username=name) for name in missing - existing]
+            for user in users:
+                user.set_unusable_password()
+            User.objects.bulk_create(users)
+        if missing:
+            self.authors.update(User.objects.filter(
+                username__in=missing
+            ).values_list('username', 'pk'))
+
+    def _resolve_groups(self, slugs):
+        missing = slugs - self.groups.keys()
+        if missing and self.create_missing:
+            existing = set(Group.objects.filter(
+                slug__in=missing
+            ).values_list('slug', flat=True))
+            Group.objects.bulk_create(
+                Group(title=slug, slug=slug) for slug in missing - existing
+            )
+        if missing:
+            self.groups.update(Group.objects.filter(
+                slug__in=missing
+            ).values_list('slug', 'pk'))
+
+    def _make_post(self, row, now):
+        if not is_valid_row(row) or not row.get('text') or (
+            not row.get('author')
+        ):
+            return None
+        author_id = self.authors.get(row['author'])
+        if author_id is None:
+            return None
+        group_id = None
+        if row.get('group'):
+            group_id = self.groups.get(row['group'])
+            if group_id is None:
+                return None
+        pub_date = now
+        if row.get('pub_date'):
+            try:
+                pub_date = parse_datetime(row['pub_date'])
+            except ValueError:
+                pub_date = None
+            if pub_date is None:
+                return None
+            if timezone.is_naive(pub_date):
+                pub_date = timezone.make_aware(pub_date)
+        return Post(
+            text=row['text'],
+            author_id=author_id,
+            group_id=group_id,
+            pub_date=pub_date
+        )
+
+    @transaction.atomic
+    def write_batch(self, rows):
+        valid = [row for row in rows if is_valid_row(row)]
+        self._resolve_authors({
+            row['author'] for row in valid if row.get('author')
+        })
+        self._resolve_groups({
+            row['group'] for row in valid if row.get('group')
+        })
+        now = timezone.now()
+        posts = [self._make_post(row, now) for row in rows]
+        posts = [post for post in posts if post is not None]
+        self.skipped += len(rows) - len(posts)
+        last_pk = Post.objects.aggregate(last=Max('pk'))['last'] or 0
+        with preserve_pub_date():
+            Post.objects.bulk_create(posts)
+        self.imported += len(posts)
+        for author_id, count in Counter(
+            post.author_id for post in posts
+        ).items():
+            change_author_count(author_id, count)
+        for group_id, count in Counter(
+            post.group_id for post in posts
+        ).items():
+            change_group_count(group_id, count)
+        # Старые посты в окна трендов не попадают, корзины для них не нужны
+        since = activity_since(now)
+        hours = Counter(
+            (post.author_id, post.group_id, activity_hour(post.pub_date))
+            for post in posts if post.pub_date >= since
+        )
+        for (author_id, group_id, hour), count in hours.items():
+            change_author_activity(author_id, hour, count)
+            change_group_activity(group_id, hour, count)
+        months = Counter(
+            (post.author_id, post.group_id, month_of(post.pub_date))
+            for post in posts
+        )
+        for (author_id, group_id, month), count in months.items():
+            change_archive_month(
+                post_scopes(author_id, group_id), month, count
+            )
+        index_posts(Post.objects.filter(pk__gt=last_pk).only('text'))
+
+
+EXPORT_FIELDS = ('id', 'text', 'pub_date', 'author', 'group')
+
+
+class Echo:
+    """Псевдофайл для csv.writer: возвращает строку вместо записи."""
+    def write(self, value):
+        return value
+
+
+def export_rows(file_format='jsonl', chunk_size=2000):
+    """
+    Построчно выгружает все посты в JSONL или CSV.
+    Посты читаются курсором пачками по chunk_size как кортежи,
+    без создания моделей, поэтому память не растет с размером таблицы.
+    """
+    rows = Post.objects.order_by('pk').values_list(
+        'pk', 'text', 'pub_date', 'author__username', 'group__slug'
+    ).iterator(chunk_size=chunk_size)
+    if file_format == 'csv':
+        writer = csv.writer(Echo())
+        yield writer.writerow(EXPORT_FIELDS)
+        for pk, text, pub_date, author, group in rows:
+            yield writer.writerow(
+                (pk, text, pub_date.isoformat(), author, group or '')
+            )
+        return
+    for pk, text, pub_date, author, group in rows:
+        yield json.dumps(dict(zip(EXPORT_FIELDS, (
+            pk, text, pub_date.isoformat(), author, group
+        ))), ensure_ascii=False) + '\n'
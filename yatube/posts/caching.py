@@ -0,0 +1,87 @@
+from django.db.models import Max
+
+from core.cache import invalidate_pages
+from core.utils import cached_count
+from .models import AuthorStats, Group, Post, User
+from .timeline import TIMELINE_GLOBAL, read_timeline
+
+# Области кэша страниц: главная, страницы группы и страницы автора
+INDEX_PAGES = 'index'
+
+
+def index_pages():
+    return INDEX_PAGES
+
+
+def group_pages(slug):
+    return f'group:{slug}'
+
+
+def profile_pages(username):
+    return f'profile:{username}'
+
+
+def invalidate_post_pages(post, *group_ids):
+    """
+    Сбрасывает страницы, на которых выводится пост:
+    главную, страницы его групп и страницы его автора.
+    """
+    group_ids = {post.group_id, *group_ids} - {None}
+    slugs = Group.objects.filter(pk__in=group_ids).values_list(
+        'slug', flat=True
+    )
+    usernames = User.objects.filter(pk=post.author_id).values_list(
+        'username', flat=True
+    )
+    invalidate_pages(
+        INDEX_PAGES,
+        *map(group_pages, slugs),
+        *map(profile_pages, usernames)
+    )
+
+
+def _version(row, dates_count=1):
+    """
+    Превращает строку выборки в версию страницы: первые dates_count
+    значений - даты изменения, вся строка - токен версии.
+    """
+    if row is None:
+        return None
+    dates = [date for date in row[:dates_count] if date is not None]
+    return max(dates, default=None), '|'.join(map(str, row))
+
+
+def index_version():
+    """
+    Версия главной: время последнего изменения, число постов и начало
+    ленты - пост попадает в ленту фоновой задачей уже после сохранения.
+    Время изменения - самая поздняя дата изменения постов авторов: она
+    сдвигается и при удалении поста, и при смене имени автора или группы.
+    """
+    last_modified = AuthorStats.objects.aggregate(
+        last=Max('posts_updated')
+    )['last']
+    count = cached_count(Post.objects.all())
+    head = (read_timeline(TIMELINE_GLOBAL) or [None])[0]
+    return last_modified, f'{last_modified}|{count}|{head}'
+
+
+def group_version(slug):
+    return _version(Group.objects.filter(slug=slug).values_list(
+        'posts_updated', 'posts_count', 'title', 'description'
+    ).first())
+
+
+def profile_version(username):
+    return _version(User.objects.filter(username=username).values_list(
+        'post_stats__posts_updated', 'post_stats__posts_count',
+        'first_name', 'last_name'
+    ).first())
+
+
+def post_version(post_id):
+    return _version(Post.objects.filter(pk=post_id).values_list(
+        'updated', 'author__post_stats__posts_updated',
+        'author__post_stats__posts_count', 'author__first_name',
+        'author__last_name', 'group__title', 'group__slug'
+    ).first(), dates_count=2)
@@ -0,0 +1,138 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, F, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Greatest, TruncHour
+from django.utils import timezone
+
+from .models import (
+    AuthorActivity, AuthorStats, Group, GroupActivity, Post
+)
+
+
+def change_author_count(author_id, delta=0):
+    """
+    Изменяет счетчик постов автора на delta
+    и отмечает время изменения его постов.
+    """
+    if delta > 0:
+        AuthorStats.objects.get_or_create(author_id=author_id)
+    AuthorStats.objects.filter(pk=author_id).update(
+        posts_count=Greatest(F('posts_count') + delta, 0),
+        posts_updated=timezone.now()
+    )
+
+
+def change_group_count(group_id, delta=0):
+    """
+    Изменяет счетчик постов группы на delta
+    и отмечает время изменения ее постов.
+    """
+    if group_id is None:
+        return
+    Group.objects.filter(pk=group_id).update(
+        posts_count=Greatest(F('posts_count') + delta, 0),
+        posts_updated=timezone.now()
+    )
+
+
+def touch_posts(author_ids=(), group_ids=()):
+    """
+    Отмечает, что посты авторов и групп выводятся иначе, хотя их число
+    не изменилось, например сменилось имя автора или готовы миниатюры.
+    Из этих дат строятся ETag и Last-Modified страниц.
+    """
+    now = timezone.now()
+    AuthorStats.objects.filter(pk__in=author_ids).update(posts_updated=now)
+    Group.objects.filter(pk__in=group_ids).update(posts_updated=now)
+
+
+def author_posts_count(author):
+    """Возвращает количество постов автора из счетчика."""
+    try:
+        return author.post_stats.posts_count
+    except AuthorStats.DoesNotExist:
+        return 0
+
+
+@transaction.atomic
+def rebuild_post_counters():
+    """Пересчитывает счетчики постов всех групп и авторов."""
+    group_posts = Post.objects.filter(group=OuterRef('pk')).order_by()
+    now = timezone.now()
+    Group.objects.update(posts_count=Coalesce(
+        Subquery(
+            group_posts.values('group').annotate(
+                total=Count('pk')
+            ).values('total'),
+            output_field=IntegerField()
+        ),
+        0
+    ), posts_updated=now)
+    AuthorStats.objects.all().delete()
+    AuthorStats.objects.bulk_create(
+        AuthorStats(
+            author_id=author_id, posts_count=posts_count, posts_updated=now
+        )
+        for author_id, posts_count in Post.objects.values_list(
+            'author'
+        ).annotate(Count('pk')).order_by()
+    )
+
+
+def activity_hour(moment):
+    """Начало часа, в корзину которого попадает момент времени."""
+    return moment.replace(minute=0, second=0, microsecond=0)
+
+
+def activity_since(now=None):
+    """Начало самой старой корзины, которая еще нужна для трендов."""
+    hours = max(settings.TRENDING_WINDOWS.values())
+    return activity_hour((now or timezone.now()) - timedelta(hours=hours))
+
+
+def _change_activity(model, pub_date, delta, **owner):
+    hour = activity_hour(pub_date)
+    if delta > 0:
+        model.objects.get_or_create(hour=hour, **owner)
+    model.objects.filter(hour=hour, **owner).update(
+        posts_count=Greatest(F('posts_count') + delta, 0)
+    )
+
+
+def change_author_activity(author_id, pub_date, delta):
+    """Изменяет на delta число постов автора в часовой корзине."""
+    _change_activity(AuthorActivity, pub_date, delta, author_id=author_id)
+
+
+def change_group_activity(group_id, pub_date, delta):
+    """Изменяет на delta число постов группы в часовой корзине."""
+    if group_id is None:
+        return
+    _change_activity(GroupActivity, pub_date, delta, group_id=group_id)
+
+
+@transaction.atomic
+def rebuild_activity():
+    """
+    Пересчитывает часовые корзины по постам за самое длинное окно
+    трендов: выборка идет по индексу даты публикации.
+    """
+    GroupActivity.objects.all().delete()
+    AuthorActivity.objects.all().delete()
+    recent = Post.objects.filter(pub_date__gte=activity_since()).annotate(
+        hour=TruncHour('pub_date')
+    ).order_by()
+    GroupActivity.objects.bulk_create(
+        GroupActivity(group_id=group_id, hour=hour, posts_count=posts_count)
+        for group_id, hour, posts_count in recent.exclude(
+            group=None
+        ).values_list('group', 'hour').annotate(Count('pk'))
+    )
+    AuthorActivity.objects.bulk_create(
+        AuthorActivity(author_id=author_id, hour=hour, posts_count=posts_count)
+        for author_id, hour, posts_count in recent.values_list(
+            'author', 'hour'
+        ).annotate(Count('pk'))
+    )
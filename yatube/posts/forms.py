@@ -7,12 +7,14 @@ from .models import Post
 class PostForm(forms.ModelForm):
     class Meta:
         model = Post
-        fields = ('text', 'group')
+        fields = ('text', 'group', 'image')
         labels = {
             'text': _('Текст'),
             'group': _('Группа'),
+            'image': _('Картинка'),
         }
         help_text = {
             'text': _('Добавь текст для поста.'),
             'group': _('Выбери группу, если хочешь.'),
+            'image': _('Прикрепи картинку, если хочешь.'),
         }
@@ -0,0 +1,144 @@
+import asyncio
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urlsplit
+
+from django.core.handlers.wsgi import WSGIHandler
+from django.test import RequestFactory
+from django.urls import reverse
+
+from core.asgi import ThreadPoolASGIHandler
+from .benchmark import _percentile
+from .models import Group, Post, User
+
+# Хост из ALLOWED_HOSTS, от имени которого идут запросы
+LOAD_TEST_HOST = 'localhost'
+
+
+def load_test_paths():
+    """Страницы для чтения, которые запрашивают клиенты по кругу."""
+    author = User.objects.order_by('-post_stats__posts_count').first()
+    group = Group.objects.order_by('-posts_count').first()
+    post = Post.objects.order_by('-pub_date', '-pk').first()
+    return [
+        reverse('posts:index'),
+        reverse('posts:group_list', args=(group.slug,)),
+        reverse('posts:profile', args=(author.username,)),
+        reverse('posts:post_detail', args=(post.pk,)),
+        reverse('api:post_list'),
+    ]
+
+
+def _report(latencies, errors, elapsed):
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': round(len(latencies) / elapsed, 1),
+        'latency_ms': {
+            'p50': round(statistics.median(latencies) * 1000, 3),
+            'p95': round(_percentile(latencies, 95) * 1000, 3),
+            'p99': round(_percentile(latencies, 99) * 1000, 3),
+            'max': round(max(latencies) * 1000, 3),
+        },
+    }
+
+
+def run_wsgi(paths, clients, requests, threads):
+    """
+    Нагружает WSGI-обработчик так, как его обслуживает сервер с пулом
+    из threads потоков: clients клиентов шлют по requests запросов,
+    задержка считается вместе с ожиданием свободного потока.
+    """
+    application = WSGIHandler()
+    factory = RequestFactory(HTTP_HOST=LOAD_TEST_HOST)
+    executor = ThreadPoolExecutor(threads)
+
+    def call(path):
+        status = {}
+
+        def start_response(line, headers, exc_info=None):
+            status['code'] = int(line.split(' ', 1)[0])
+
+        result = application(factory.get(path).environ, start_response)
+        try:
+            b''.join(result)
+        finally:
+            result.close()
+        return status['code']
+
+    def client(number):
+        latencies, errors = [], 0
+        for i in range(requests):
+            started = time.perf_counter()
+            code = executor.submit(
+                call, paths[(number + i) % len(paths)]
+            ).result()
+            latencies.append(time.perf_counter() - started)
+            errors += code >= 400
+        return latencies, errors
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(clients) as client_pool:
+        results = list(client_pool.map(client, range(clients)))
+    elapsed = time.perf_counter() - started
+    executor.shutdown()
+    return _report(
+        [value for latencies, _ in results for value in latencies],
+        sum(errors for _, errors in results), elapsed
+    )
+
+
+def run_asgi(paths, clients, requests, threads):
+    """
+    Нагружает ASGI-приложение: clients конкурентных клиентов в одном
+    событийном цикле, запросы выполняются в пуле из threads потоков.
+    """
+    application = ThreadPoolASGIHandler(WSGIHandler(), threads)
+
+    async def call(path):
+        url = urlsplit(path)
+        scope = {
+            'type': 'http',
+            'method': 'GET',
+            'path': url.path,
+            'query_string': url.query.encode(),
+            'headers': [(b'host', LOAD_TEST_HOST.encode())],
+            'server': (LOAD_TEST_HOST, 80),
+            'client': ('127.0.0.1', 0),
+        }
+        messages = []
+
+        async def receive():
+            return {'type': 'http.request', 'body': b''}
+
+        async def send(message):
+            messages.append(message)
+
+        await application(scope, receive, send)
+        return messages[0]['status']
+
+    async def client(number):
+        latencies, errors = [], 0
+        for i in range(requests):
+            started = time.perf_counter()
+            code = await call(paths[(number + i) % len(paths)])
+            latencies.append(time.perf_counter() - started)
+            errors += code >= 400
+        return latencies, errors
+
+    async def main():
+        return await asyncio.gather(*map(client, range(clients)))
+
+    loop = asyncio.new_event_loop()
+    try:
+        started = time.perf_counter()
+        results = loop.run_until_complete(main())
+        elapsed = time.perf_counter() - started
+    finally:
+        loop.close()
+    application.executor.shutdown()
+    return _report(
+        [value for latencies, _ in results for value in latencies],
+        sum(errors for _, errors in results), elapsed
+    )
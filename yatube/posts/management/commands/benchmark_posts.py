@@ -0,0 +1,44 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from posts.benchmark import run_benchmarks, seed
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет тестовую базу сгенерированными постами и замеряет '
+        'задержку, число запросов, память и размер страниц постов'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--repeat', type=int, default=10)
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument(
+            '--output', help='Файл для JSON-отчета, по умолчанию stdout'
+        )
+
+    def handle(self, *args, **options):
+        # Замеры идут на отдельной тестовой базе, рабочая не меняется
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            self.stderr.write(f'Генерируем {options["posts"]} постов...')
+            seed(
+                options['posts'], options['users'],
+                options['groups'], options['seed']
+            )
+            report = run_benchmarks(options['repeat'])
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        report = json.dumps(report, indent=2, sort_keys=True)
+        if options['output']:
+            with open(options['output'], 'w') as output:
+                output.write(report + '\n')
+        else:
+            self.stdout.write(report)
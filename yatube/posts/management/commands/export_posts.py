@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from posts.bulk import export_rows
+
+FORMATS = ('jsonl', 'csv')
+
+
+class Command(BaseCommand):
+    help = 'Выгружает все посты с автором и группой в JSONL или CSV'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=FORMATS, default='jsonl')
+        parser.add_argument('--chunk-size', type=int, default=2000)
+        parser.add_argument(
+            '--output', help='Файл для выгрузки, по умолчанию stdout'
+        )
+
+    def handle(self, *args, **options):
+        lines = export_rows(options['format'], options['chunk_size'])
+        if not options['output']:
+            for line in lines:
+                self.stdout.write(line, ending='')
+            return
+        with open(
+            options['output'], 'w', encoding='utf-8', newline=''
+        ) as output:
+            output.writelines(lines)
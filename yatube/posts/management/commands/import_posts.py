@@ -0,0 +1,59 @@
+import os
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.bulk import PostImporter, read_rows
+
+FORMATS = ('jsonl', 'csv')
+
+
+class Command(BaseCommand):
+    help = (
+        'Импортирует посты из JSONL или CSV с полями text, author '
+        '(username), group (slug) и pub_date. Путь "-" читает stdin'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument(
+            '--create-missing', action='store_true',
+            help='Создавать отсутствующих авторов и группы'
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format']
+        if file_format is None:
+            extension = os.path.splitext(path)[1].lstrip('.')
+            file_format = extension if extension in FORMATS else 'jsonl'
+        importer = PostImporter(
+            options['batch_size'], options['create_missing']
+        )
+        started = time.monotonic()
+
+        def progress(importer):
+            rate = importer.imported / (time.monotonic() - started)
+            self.stderr.write(
+                f'Импортировано {importer.imported} постов '
+                f'({rate:.0f} в секунду)'
+            )
+
+        try:
+            stream = (
+                sys.stdin if path == '-'
+                else open(path, encoding='utf-8', newline='')
+            )
+        except OSError as error:
+            raise CommandError(error)
+        with stream:
+            importer.run(read_rows(stream, file_format), progress)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано {importer.imported} постов, пропущено '
+            f'{importer.skipped} за {elapsed:.1f} с '
+            f'({importer.imported / max(elapsed, 1e-9):.0f} в секунду)'
+        ))
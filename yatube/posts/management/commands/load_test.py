@@ -0,0 +1,58 @@
+import json
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from posts.benchmark import seed
+from posts.loadtest import load_test_paths, run_asgi, run_wsgi
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает запросы в секунду и хвосты задержек страниц постов '
+        'при конкурентных клиентах через WSGI и через ASGI'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10000)
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--groups', type=int, default=20)
+        parser.add_argument('--clients', type=int, default=50)
+        parser.add_argument(
+            '--requests', type=int, default=20,
+            help='Запросов от каждого клиента'
+        )
+        parser.add_argument(
+            '--threads', type=int, default=8,
+            help='Рабочих потоков у WSGI-сервера и в пуле ASGI'
+        )
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        # Нагрузка идет на отдельную тестовую базу, рабочая не меняется
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            self.stderr.write(f'Генерируем {options["posts"]} постов...')
+            seed(
+                options['posts'], options['users'],
+                options['groups'], options['seed']
+            )
+            paths = load_test_paths()
+            load = (
+                paths, options['clients'],
+                options['requests'], options['threads']
+            )
+            report = {
+                'meta': {
+                    key: options[key] for key in (
+                        'posts', 'clients', 'requests', 'threads'
+                    )
+                },
+                'wsgi': run_wsgi(*load),
+                'asgi': run_asgi(*load),
+            }
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+        self.stdout.write(json.dumps(report, indent=2, sort_keys=True))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from posts.archive import rebuild_archive
+from posts.counters import rebuild_post_counters
+
+
+class Command(BaseCommand):
+    help = (
+        'Пересчитывает счетчики постов групп и авторов '
+        'и сводку архива по месяцам'
+    )
+
+    def handle(self, *args, **options):
+        rebuild_post_counters()
+        rebuild_archive()
+        self.stdout.write(self.style.SUCCESS('Счетчики постов пересчитаны'))
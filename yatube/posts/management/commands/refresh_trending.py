@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from posts.counters import rebuild_activity
+from posts.trending import refresh_trending
+
+
+class Command(BaseCommand):
+    help = (
+        'Обновляет закэшированный рейтинг активных групп и авторов, '
+        'запускается по расписанию каждые TRENDING_REFRESH_INTERVAL секунд'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild', action='store_true',
+            help='Сначала пересчитать часовые корзины по постам'
+        )
+
+    def handle(self, *args, **options):
+        if options['rebuild']:
+            rebuild_activity()
+        refresh_trending()
+        self.stdout.write(self.style.SUCCESS('Рейтинг обновлен'))
@@ -0,0 +1,48 @@
+# Generated by Django 2.2.16 on 2026-10-18 12:00
+
+from django.db import migrations
+
+from core.stemmer import stem_words
+
+
+def create_search_index(apps, schema_editor):
+    connection = schema_editor.connection
+    if connection.vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE INDEX posts_post_text_search ON posts_post USING GIN "
+            "(to_tsvector('russian'::regconfig, COALESCE(text, '')))"
+        )
+    elif connection.vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE posts_post_fts USING fts5("
+            "text, tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        Post = apps.get_model('posts', 'Post')
+        rows = [
+            (pk, ' '.join(stem_words(text)))
+            for pk, text in Post.objects.values_list('pk', 'text').iterator()
+        ]
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                'INSERT INTO posts_post_fts (rowid, text) VALUES (%s, %s)',
+                rows
+            )
+
+
+def drop_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'postgresql':
+        schema_editor.execute('DROP INDEX posts_post_text_search')
+    elif vendor == 'sqlite':
+        schema_editor.execute('DROP TABLE posts_post_fts')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0009_post_counters'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
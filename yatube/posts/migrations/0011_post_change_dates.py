@@ -0,0 +1,27 @@
+# Generated by Django 2.2.16 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0010_post_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='authorstats',
+            name='posts_updated',
+            field=models.DateTimeField(null=True, verbose_name='дата изменения постов'),
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='posts_updated',
+            field=models.DateTimeField(editable=False, null=True, verbose_name='дата изменения постов'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(fields=['updated'], name='post_updated_idx'),
+        ),
+    ]
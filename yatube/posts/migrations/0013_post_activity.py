@@ -0,0 +1,50 @@
+# Generated by Django 2.2.16 on 2026-10-18 12:00
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('posts', '0012_post_image'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GroupActivity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(verbose_name='час')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='количество постов')),
+                ('group', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity', to='posts.Group', verbose_name='группа')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='AuthorActivity',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('hour', models.DateTimeField(verbose_name='час')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='количество постов')),
+                ('author', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activity', to=settings.AUTH_USER_MODEL, verbose_name='автор')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='groupactivity',
+            index=models.Index(fields=['hour'], name='group_activity_hour_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='groupactivity',
+            unique_together={('group', 'hour')},
+        ),
+        migrations.AddIndex(
+            model_name='authoractivity',
+            index=models.Index(fields=['hour'], name='author_activity_hour_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='authoractivity',
+            unique_together={('author', 'hour')},
+        ),
+    ]
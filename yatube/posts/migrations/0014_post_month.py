@@ -0,0 +1,25 @@
+# Generated by Django 2.2.16 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0013_post_activity'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostMonth',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(help_text='all, group:<id> или author:<id>', max_length=50, verbose_name='область')),
+                ('month', models.DateField(verbose_name='первый день месяца')),
+                ('posts_count', models.PositiveIntegerField(default=0, verbose_name='количество постов')),
+            ],
+            options={
+                'unique_together': {('scope', 'month')},
+            },
+        ),
+    ]
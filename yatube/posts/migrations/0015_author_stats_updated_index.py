@@ -0,0 +1,18 @@
+# Generated by Django 2.2.16 on 2026-10-18 12:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0014_post_month'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='authorstats',
+            name='posts_updated',
+            field=models.DateTimeField(db_index=True, null=True, verbose_name='дата изменения постов'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 2.2.16 on 2026-10-18 12:00
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0015_author_stats_updated_index'),
+    ]
+
+    operations = [
+        migrations.RemoveIndex(
+            model_name='post',
+            name='post_updated_idx',
+        ),
+    ]
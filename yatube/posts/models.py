@@ -1,11 +1,30 @@
+import json
+
 from django.db import models
 from django.contrib.auth import get_user_model
+from django.utils.functional import cached_property
 
 
 User = get_user_model()
 
 NUMBER_OF_LETTERS = 15
 
+# Поля, которые выводятся в карточке поста в ленте
+FEED_FIELDS = (
+    'text',
+    'pub_date',
+    'updated',
+    'author',
+    'group',
+    'image',
+    'thumbnails',
+    'author__username',
+    'author__first_name',
+    'author__last_name',
+    'group__slug',
+    'group__title',
+)
+
 
 class Group(models.Model):
     title = models.CharField(
@@ -22,11 +41,49 @@ class Group(models.Model):
         verbose_name='описание группы',
         help_text='группа предназначена для определенной тематики'
     )
+    posts_count = models.PositiveIntegerField(
+        verbose_name='количество постов',
+        default=0,
+        editable=False
+    )
+    posts_updated = models.DateTimeField(
+        verbose_name='дата изменения постов',
+        null=True,
+        editable=False
+    )
 
     def __str__(self):
         return self.title
 
 
+class AuthorStats(models.Model):
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='post_stats',
+        verbose_name='автор'
+    )
+    posts_count = models.PositiveIntegerField(
+        verbose_name='количество постов',
+        default=0
+    )
+    posts_updated = models.DateTimeField(
+        verbose_name='дата изменения постов',
+        null=True,
+        db_index=True
+    )
+
+    def __str__(self):
+        return f'{self.author}: {self.posts_count}'
+
+
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        """Посты для ленты: автор и группа подгружаются одним запросом."""
+        return self.select_related('author', 'group').only(*FEED_FIELDS)
+
+
 class Post(models.Model):
     text = models.TextField(
         verbose_name='текст поста',
@@ -36,6 +93,10 @@ class Post(models.Model):
         verbose_name='дата публикации',
         auto_now_add=True,
     )
+    updated = models.DateTimeField(
+        verbose_name='дата изменения',
+        auto_now=True,
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -51,9 +112,106 @@ class Post(models.Model):
         verbose_name='группа',
         help_text='выберите группу'
     )
+    image = models.ImageField(
+        verbose_name='картинка',
+        upload_to='posts/',
+        blank=True,
+        help_text='загрузите картинку'
+    )
+    thumbnails = models.TextField(
+        verbose_name='миниатюры',
+        blank=True,
+        editable=False,
+        help_text='адреса готовых миниатюр картинки в JSON'
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         ordering = ['-pub_date']
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'], name='post_pub_date_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_pub_date_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_pub_date_idx'
+            ),
+        ]
 
     def __str__(self):
         return self.text[:NUMBER_OF_LETTERS]
+
+    @cached_property
+    def thumbnail(self):
+        """Готовые миниатюры картинки или None, пока они не созданы."""
+        return json.loads(self.thumbnails) if self.thumbnails else None
+
+
+class GroupActivity(models.Model):
+    group = models.ForeignKey(
+        Group,
+        on_delete=models.CASCADE,
+        related_name='activity',
+        verbose_name='группа'
+    )
+    hour = models.DateTimeField(verbose_name='час')
+    posts_count = models.PositiveIntegerField(
+        verbose_name='количество постов',
+        default=0
+    )
+
+    class Meta:
+        unique_together = ('group', 'hour')
+        indexes = [
+            models.Index(fields=['hour'], name='group_activity_hour_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.group} {self.hour:%Y-%m-%d %H}: {self.posts_count}'
+
+
+class AuthorActivity(models.Model):
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='activity',
+        verbose_name='автор'
+    )
+    hour = models.DateTimeField(verbose_name='час')
+    posts_count = models.PositiveIntegerField(
+        verbose_name='количество постов',
+        default=0
+    )
+
+    class Meta:
+        unique_together = ('author', 'hour')
+        indexes = [
+            models.Index(fields=['hour'], name='author_activity_hour_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.author} {self.hour:%Y-%m-%d %H}: {self.posts_count}'
+
+
+class PostMonth(models.Model):
+    scope = models.CharField(
+        verbose_name='область',
+        max_length=50,
+        help_text='all, group:<id> или author:<id>'
+    )
+    month = models.DateField(verbose_name='первый день месяца')
+    posts_count = models.PositiveIntegerField(
+        verbose_name='количество постов',
+        default=0
+    )
+
+    class Meta:
+        unique_together = ('scope', 'month')
+
+    def __str__(self):
+        return f'{self.scope} {self.month:%Y-%m}: {self.posts_count}'
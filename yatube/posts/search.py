@@ -0,0 +1,104 @@
+from django.db import connection
+
+from core.stemmer import stem_words
+from .models import Post
+
+FTS_TABLE = 'posts_post_fts'
+# Выражение совпадает с GIN-индексом из миграции для PostgreSQL
+PG_SEARCH_CONFIG = 'russian'
+
+
+def stemmed_text(text):
+    return ' '.join(stem_words(text))
+
+
+def index_posts(posts):
+    """Добавляет или обновляет посты в поисковом индексе SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    rows = [(post.pk, stemmed_text(post.text)) for post in posts]
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+            [(pk,) for pk, _ in rows]
+        )
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE} (rowid, text) VALUES (%s, %s)', rows
+        )
+
+
+def unindex_posts(*post_ids):
+    """Удаляет посты из поискового индекса SQLite."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+            [(pk,) for pk in post_ids]
+        )
+
+
+def rebuild_search_index(batch_size=1000):
+    """Заново строит поисковый индекс по всем постам."""
+    if connection.vendor != 'sqlite':
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    batch = []
+    for post in Post.objects.only('text').order_by().iterator(
+        chunk_size=batch_size
+    ):
+        batch.append(post)
+        if len(batch) == batch_size:
+            index_posts(batch)
+            batch = []
+    index_posts(batch)
+
+
+class SQLiteSearchResults:
+    """
+    Результаты поиска по FTS5, упорядоченные по релевантности.
+    Поддерживает count() и срезы, поэтому подходит для Paginator:
+    из базы загружаются только посты выводимой страницы.
+    """
+    def __init__(self, match):
+        self.match = match
+
+    def count(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT COUNT(*) FROM {FTS_TABLE} '
+                f'WHERE {FTS_TABLE} MATCH %s', [self.match]
+            )
+            return cursor.fetchone()[0]
+
+    def __getitem__(self, page):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s '
+                f'ORDER BY rank LIMIT %s OFFSET %s',
+                [self.match, page.stop - page.start, page.start]
+            )
+            ids = [row[0] for row in cursor.fetchall()]
+        posts = Post.objects.for_feed().in_bulk(ids)
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+def search_posts(query):
+    """
+    Ищет посты по словам запроса с учетом словоформ.
+    Возвращает объект, пригодный для постраничного вывода.
+    """
+    if connection.vendor == 'postgresql':
+        from django.contrib.postgres.search import (
+            SearchQuery, SearchRank, SearchVector
+        )
+        vector = SearchVector('text', config=PG_SEARCH_CONFIG)
+        search_query = SearchQuery(query, config=PG_SEARCH_CONFIG)
+        return Post.objects.for_feed().annotate(
+            search=vector, rank=SearchRank(vector, search_query)
+        ).filter(search=search_query).order_by('-rank', '-pub_date')
+    stems = stem_words(query)
+    if not stems:
+        return Post.objects.none()
+    return SQLiteSearchResults(' '.join(f'"{word}"' for word in stems))
@@ -0,0 +1,219 @@
+from django.db import transaction
+from django.db.models.signals import (
+    post_delete, post_save, pre_delete, pre_save
+)
+from django.dispatch import receiver
+
+from core.cache import invalidate_pages
+from core.utils import invalidate_counts
+from .archive import (
+    archive_scope, change_archive_month, month_of, post_scopes
+)
+from .caching import (
+    INDEX_PAGES, group_pages, invalidate_post_pages, profile_pages
+)
+from .counters import (
+    change_author_activity, change_author_count, change_group_activity,
+    change_group_count, touch_posts
+)
+from .models import Group, Post, User
+from .search import unindex_posts
+from .tasks import drop_thumbnails, fan_out, index_post, make_thumbnails
+from .templatetags.post_cards import invalidate_post_cards
+from .timeline import remove_post
+
+
+@receiver(pre_save, sender=Post)
+def remember_previous_state(sender, instance, **kwargs):
+    """
+    Запоминает прежнюю группу поста, чтобы сбросить и ее страницы,
+    и прежнюю картинку, если ее заменили или убрали: ее миниатюры
+    сбрасываются, а файл удаляет фоновая задача.
+    """
+    previous_group_id, previous_image = None, ''
+    if instance.pk is not None:
+        previous_group_id, previous_image = Post.objects.filter(
+            pk=instance.pk
+        ).values_list('group_id', 'image').first() or (None, '')
+    instance._previous_group_id = previous_group_id
+    instance._image_changed = instance.image.name != previous_image
+    instance._previous_image = ''
+    if instance._image_changed:
+        instance._previous_image = previous_image
+        instance.thumbnails = ''
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, **kwargs):
+    """
+    Обновляет счетчики и время изменения постов автора и групп,
+    часовые корзины активности для трендов и сводку архива по месяцам.
+    """
+    previous_group_id = getattr(instance, '_previous_group_id', None)
+    with transaction.atomic():
+        if created:
+            change_author_count(instance.author_id, 1)
+            change_group_count(instance.group_id, 1)
+            change_author_activity(instance.author_id, instance.pub_date, 1)
+            change_group_activity(instance.group_id, instance.pub_date, 1)
+            change_archive_month(
+                post_scopes(instance.author_id, instance.group_id),
+                month_of(instance.pub_date), 1
+            )
+            return
+        change_author_count(instance.author_id)
+        if previous_group_id != instance.group_id:
+            change_group_count(previous_group_id, -1)
+            change_group_count(instance.group_id, 1)
+            change_group_activity(previous_group_id, instance.pub_date, -1)
+            change_group_activity(instance.group_id, instance.pub_date, 1)
+            if previous_group_id is not None:
+                change_archive_month(
+                    [archive_scope(group_id=previous_group_id)],
+                    month_of(instance.pub_date), -1
+                )
+            if instance.group_id is not None:
+                change_archive_month(
+                    [archive_scope(group_id=instance.group_id)],
+                    month_of(instance.pub_date), 1
+                )
+        else:
+            change_group_count(instance.group_id)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    """
+    Уменьшает счетчики постов, корзины активности и сводку архива
+    автора и группы удаленного поста.
+    """
+    with transaction.atomic():
+        change_author_count(instance.author_id, -1)
+        change_group_count(instance.group_id, -1)
+        change_author_activity(instance.author_id, instance.pub_date, -1)
+        change_group_activity(instance.group_id, instance.pub_date, -1)
+        change_archive_month(
+            post_scopes(instance.author_id, instance.group_id),
+            month_of(instance.pub_date), -1
+        )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def reset_post_counts(sender, **kwargs):
+    """Сбрасывает закэшированные подсчеты постов для паджинатора."""
+    invalidate_counts()
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def reset_post_card(sender, instance, **kwargs):
+    """Удаляет из кэша карточку измененного или удаленного поста."""
+    invalidate_post_cards(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def reset_post_pages(sender, instance, **kwargs):
+    """Сбрасывает закэшированные страницы, на которых выводится пост."""
+    invalidate_post_pages(
+        instance, getattr(instance, '_previous_group_id', None)
+    )
+
+
+@receiver(post_save, sender=Post)
+def index_saved_post(sender, instance, **kwargs):
+    """Ставит в очередь обновление поста в поисковом индексе."""
+    index_post.delay(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def unindex_deleted_post(sender, instance, **kwargs):
+    """Удаляет пост из поискового индекса."""
+    unindex_posts(instance.pk)
+
+
+@receiver(post_save, sender=Post)
+def fan_out_created_post(sender, instance, created, **kwargs):
+    """Ставит в очередь раскладку нового поста по лентам читателей."""
+    if created:
+        fan_out.delay(instance.pk)
+
+
+@receiver(post_delete, sender=Post)
+def remove_deleted_post(sender, instance, **kwargs):
+    """
+    Убирает удаленный пост из лент читателей сразу, не дожидаясь очереди:
+    после удаления поста его не должно быть ни на одной странице.
+    """
+    remove_post(instance)
+
+
+@receiver(post_save, sender=Post)
+def process_changed_image(sender, instance, **kwargs):
+    """
+    Ставит в очередь создание или удаление миниатюр картинки
+    и удаление файла прежней картинки.
+    """
+    if not getattr(instance, '_image_changed', False):
+        return
+    previous_image = getattr(instance, '_previous_image', '')
+    if instance.image:
+        make_thumbnails.delay(instance.pk, previous_image)
+    else:
+        drop_thumbnails.delay(instance.pk, previous_image)
+
+
+@receiver(post_delete, sender=Post)
+def drop_deleted_post_thumbnails(sender, instance, **kwargs):
+    """Ставит в очередь удаление картинки и миниатюр удаленного поста."""
+    if instance.image:
+        drop_thumbnails.delay(instance.pk, instance.image.name)
+
+
+@receiver(pre_save, sender=Group)
+def remember_previous_slug(sender, instance, **kwargs):
+    """Запоминает прежний адрес группы, чтобы сбросить его страницы."""
+    instance._previous_slug = None
+    if instance.pk is not None:
+        instance._previous_slug = Group.objects.filter(
+            pk=instance.pk
+        ).values_list('slug', flat=True).first()
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def reset_group_pages(sender, instance, **kwargs):
+    """Ссылки на группу есть на главной - сбрасываем и ее."""
+    slugs = {instance.slug, getattr(instance, '_previous_slug', None)}
+    invalidate_pages(INDEX_PAGES, *map(group_pages, slugs - {None}))
+
+
+@receiver(post_save, sender=Group)
+@receiver(pre_delete, sender=Group)
+def touch_group_posts(sender, instance, **kwargs):
+    """
+    Название группы выводится в карточках ее постов - сдвигаем даты
+    изменения постов группы и их авторов, чтобы сменились ETag страниц.
+    """
+    touch_posts(instance.posts.values('author'), [instance.pk])
+
+
+@receiver(post_save, sender=User)
+def reset_author_post_cards(sender, instance, created, update_fields,
+                            **kwargs):
+    """
+    Карточки показывают имя автора - сбрасываем их при его изменении
+    и сдвигаем даты изменения его постов и групп для ETag страниц.
+    """
+    if created or update_fields == frozenset({'last_login'}):
+        return
+    invalidate_post_cards(*instance.posts.values_list('pk', flat=True))
+    groups = Group.objects.filter(posts__author=instance)
+    touch_posts([instance.pk], groups.values('pk'))
+    slugs = groups.values_list('slug', flat=True).distinct()
+    invalidate_pages(
+        INDEX_PAGES,
+        profile_pages(instance.username),
+        *map(group_pages, slugs)
+    )
@@ -0,0 +1,81 @@
+import json
+
+from django.core.files.storage import default_storage
+from django.db import transaction
+from django.utils import timezone
+
+from core.cache import invalidate_pages
+from core.queue import task
+from .caching import INDEX_PAGES, invalidate_post_pages
+from .counters import touch_posts
+from .models import Post
+from .search import index_posts
+from .templatetags.post_cards import invalidate_post_cards
+from .thumbnails import delete_thumbnails, generate_thumbnails
+from .timeline import fan_out_post
+
+
+@task
+def index_post(post_id):
+    """Обновляет пост в поисковом индексе."""
+    index_posts(Post.objects.filter(pk=post_id).only('text'))
+
+
+@task
+def fan_out(post_id):
+    """
+    Раскладывает новый пост по лентам читателей и сбрасывает страницы,
+    собранные из лент до его появления.
+    """
+    post = Post.objects.filter(pk=post_id).only('pub_date', 'author').first()
+    if post is None:
+        return
+    fan_out_post(post)
+    invalidate_pages(INDEX_PAGES)
+
+
+def delete_previous_image(name):
+    """
+    Удаляет файл прежней картинки поста после фиксации транзакции:
+    при откате пост снова ссылается на этот файл.
+    """
+    if not name:
+        return
+
+    def delete():
+        if not Post.objects.filter(image=name).exists():
+            default_storage.delete(name)
+
+    transaction.on_commit(delete)
+
+
+@task
+def make_thumbnails(post_id, previous_image=''):
+    """
+    Создает миниатюры картинки поста вне запроса и сохраняет их адреса,
+    чтобы при выводе страниц картинки не обрабатывались.
+    Файл замененной картинки удаляется.
+    """
+    delete_previous_image(previous_image)
+    post = Post.objects.filter(pk=post_id).first()
+    if post is None or not post.image:
+        return
+    thumbnails = generate_thumbnails(post)
+    # Картинку могли заменить, пока создавались миниатюры
+    updated = Post.objects.filter(pk=post_id, image=post.image.name).update(
+        thumbnails=json.dumps(thumbnails), updated=timezone.now()
+    )
+    if updated:
+        touch_posts([post.author_id], [post.group_id])
+        invalidate_post_cards(post_id)
+        invalidate_post_pages(post)
+
+
+@task
+def drop_thumbnails(post_id, previous_image=''):
+    """
+    Удаляет миниатюры и файл картинки поста, у которого больше
+    нет картинки.
+    """
+    delete_previous_image(previous_image)
+    delete_thumbnails(post_id)
@@ -0,0 +1,37 @@
+from django import template
+from django.conf import settings
+from django.core.cache import caches
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+register = template.Library()
+
+POST_CARD_TEMPLATE = 'includes/posts_article.html'
+
+
+def post_card_key(post_id):
+    return f'post_card:{post_id}'
+
+
+def invalidate_post_cards(*post_ids):
+    """Удаляет из кэша карточки постов с указанными id."""
+    caches[settings.POST_CARD_CACHE].delete_many(
+        [post_card_key(post_id) for post_id in post_ids]
+    )
+
+
+@register.simple_tag
+def post_card(post):
+    """
+    Выводит карточку поста. Готовый HTML хранится в кэше вместе
+    с датой изменения поста и перерисовывается, только если пост изменился.
+    """
+    cache = caches[settings.POST_CARD_CACHE]
+    key = post_card_key(post.pk)
+    updated = post.updated.timestamp()
+    cached = cache.get(key)
+    if cached is not None and cached[0] == updated:
+        return mark_safe(cached[1])
+    html = render_to_string(POST_CARD_TEMPLATE, {'post': post})
+    cache.set(key, (updated, html), settings.POST_CARD_TIMEOUT)
+    return mark_safe(html)
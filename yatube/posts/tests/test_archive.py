@@ -0,0 +1,148 @@
+from datetime import date, datetime
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ..archive import (
+    ARCHIVE_ALL, archive_scope, month_of, month_range, rebuild_archive
+)
+from ..models import Group, Post, PostMonth
+
+User = get_user_model()
+
+
+class ArchiveTest(TestCase):
+    """Проверяем сводку архива по месяцам и страницы архива"""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='testuser')
+        cls.group = Group.objects.create(
+            title='Тестовая группа 1',
+            slug='test-slug-1',
+            description='Тестовое описание 1'
+        )
+        cls.group_2 = Group.objects.create(
+            title='Тестовая группа 2',
+            slug='test-slug-2',
+            description='Тестовое описание 2'
+        )
+        cls.guest_client = Client()
+
+    def setUp(self):
+        cache.clear()
+        self.this_month = month_of(timezone.now())
+        for i in range(3):
+            Post.objects.create(
+                author=self.user, text=f'Новый пост {i}', group=self.group
+            )
+        self.old_post = Post.objects.create(
+            author=self.user, text='Старый пост', group=self.group_2
+        )
+        # Дату публикации задаем в обход сигналов и пересчитываем сводку
+        Post.objects.filter(pk=self.old_post.pk).update(
+            pub_date=timezone.make_aware(datetime(2020, 5, 31, 23, 59))
+        )
+        rebuild_archive()
+
+    def summary(self):
+        return {
+            (scope, month): posts_count
+            for scope, month, posts_count in PostMonth.objects.values_list(
+                'scope', 'month', 'posts_count'
+            )
+        }
+
+    def test_month_range_crosses_year(self):
+        """Границы декабря заканчиваются первым января следующего года"""
+        start, end = month_range(2021, 12)
+        self.assertEqual((start.year, start.month), (2021, 12))
+        self.assertEqual((end.year, end.month, end.day), (2022, 1, 1))
+
+    def test_rebuild_counts_scopes(self):
+        """Сводка содержит месяцы всех постов, групп и авторов"""
+        may = date(2020, 5, 1)
+        self.assertEqual(self.summary(), {
+            (ARCHIVE_ALL, may): 1,
+            (ARCHIVE_ALL, self.this_month): 3,
+            (archive_scope(author_id=self.user.pk), may): 1,
+            (archive_scope(author_id=self.user.pk), self.this_month): 3,
+            (archive_scope(group_id=self.group_2.pk), may): 1,
+            (archive_scope(group_id=self.group.pk), self.this_month): 3,
+        })
+
+    def test_signals_keep_summary_in_sync(self):
+        """Создание, смена группы и удаление поста меняют сводку"""
+        post = Post.objects.create(author=self.user, text='Пост')
+        post.group = self.group_2
+        post.save()
+        Post.objects.filter(text='Новый пост 0').delete()
+        incremental = self.summary()
+        rebuild_archive()
+        self.assertEqual(
+            {key: count for key, count in incremental.items() if count},
+            self.summary()
+        )
+
+    def test_month_page_shows_only_month_posts(self):
+        """Страница месяца выводит посты только этого месяца без COUNT"""
+        url = reverse('posts:archive_month', args=(2020, 5))
+        with CaptureQueriesContext(connection) as queries:
+            response = self.guest_client.get(url)
+        self.assertEqual(
+            [post.pk for post in response.context['page_obj']],
+            [self.old_post.pk]
+        )
+        self.assertEqual(response.context['page_obj'].paginator.count, 1)
+        self.assertFalse(any(
+            'COUNT(' in query['sql'] for query in queries.captured_queries
+        ))
+        self.assertContains(
+            response, reverse(
+                'posts:archive_month',
+                args=(self.this_month.year, self.this_month.month)
+            )
+        )
+
+    def test_month_page_filtered_by_group(self):
+        """Фильтр по группе берет посты и месяцы только этой группы"""
+        response = self.guest_client.get(
+            reverse(
+                'posts:archive_month',
+                args=(self.this_month.year, self.this_month.month)
+            ),
+            {'group': self.group.slug}
+        )
+        self.assertEqual(len(response.context['page_obj']), 3)
+        self.assertEqual(
+            [item.month for item in response.context['months']],
+            [self.this_month]
+        )
+        response = self.guest_client.get(
+            reverse('posts:archive_month', args=(2020, 5)),
+            {'group': self.group.slug}
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_index_lists_months(self):
+        """Оглавление архива выводит непустые месяцы, новые сначала"""
+        response = self.guest_client.get(reverse('posts:archive_index'))
+        self.assertTemplateUsed(response, 'posts/archive.html')
+        self.assertEqual(
+            [item.month for item in response.context['months']],
+            [self.this_month, date(2020, 5, 1)]
+        )
+
+    def test_empty_or_invalid_month_not_found(self):
+        """Пустой или несуществующий месяц отдает 404"""
+        for year, month in ((2019, 1), (2020, 13), (0, 1)):
+            with self.subTest(year=year, month=month):
+                response = self.guest_client.get(
+                    reverse('posts:archive_month', args=(year, month))
+                )
+                self.assertEqual(response.status_code, 404)
@@ -0,0 +1,43 @@
+from django.test import TestCase
+
+from ..benchmark import run_benchmarks, seed
+from ..models import Group, Post, User
+
+
+class BenchmarkTest(TestCase):
+    """Проверяем генерацию данных и отчет бенчмарка"""
+    def test_seed_creates_dataset_with_counters(self):
+        """Проверяем, что данные созданы и счетчики пересчитаны"""
+        seed(posts=30, users=3, groups=2)
+        self.assertEqual(Post.objects.count(), 30)
+        self.assertEqual(User.objects.count(), 3)
+        self.assertEqual(
+            sum(Group.objects.values_list('posts_count', flat=True)),
+            Post.objects.exclude(group=None).count()
+        )
+
+    def test_report_contains_all_cases(self):
+        """Проверяем, что отчет содержит замеры всех страниц"""
+        seed(posts=30, users=3, groups=2)
+        report = run_benchmarks(repeat=1)
+        self.assertEqual(report['meta']['posts'], 30)
+        cases = (
+            'index', 'group_posts', 'profile', 'post_detail',
+            'post_create', 'deep_page_offset', 'deep_page_cursor',
+            'api_posts', 'api_group_posts', 'api_profile_posts',
+            'api_post_detail'
+        )
+        for case in cases:
+            with self.subTest(case=case):
+                result = report['results'][case]['cold']
+                self.assertIn(result['status'], (200, 302))
+                self.assertGreater(result['queries'], 0)
+
+    def test_report_contains_bytes_on_the_wire(self):
+        """Проверяем, что отчет сравнивает размеры без сжатия и со сжатием"""
+        seed(posts=30, users=3, groups=2)
+        report = run_benchmarks(repeat=1)
+        wire_bytes = report['results']['index']['wire_bytes']
+        self.assertLess(wire_bytes['gzip'], wire_bytes['identity'])
+        css = report['static']['css/bootstrap.min.css']
+        self.assertLess(css['gzip'], css['identity'])
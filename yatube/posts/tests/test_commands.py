@@ -0,0 +1,145 @@
+import json
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from django.contrib.auth import get_user_model
+
+from ..counters import author_posts_count
+from ..models import Group, Post
+from ..search import search_posts
+
+User = get_user_model()
+
+
+class ImportPostsCommandTest(TestCase):
+    """Проверяем массовый импорт постов"""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='testuser')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+
+    def write_file(self, suffix, content):
+        source = tempfile.NamedTemporaryFile(
+            'w', suffix=suffix, encoding='utf-8', delete=False
+        )
+        self.addCleanup(source.close)
+        source.write(content)
+        source.flush()
+        return source.name
+
+    def test_import_jsonl_in_batches(self):
+        """
+        Проверяем импорт JSONL: даты сохраняются, неверные строки
+        пропускаются, счетчики и поиск обновляются
+        """
+        rows = [
+            {'text': f'Импортированный пост {i}', 'author': 'testuser',
+             'group': 'test-slug', 'pub_date': f'2020-01-0{i}T10:00:00'}
+            for i in range(1, 6)
+        ]
+        rows.append({'text': 'Без автора', 'author': 'unknown'})
+        path = self.write_file('.jsonl', '\n'.join(
+            [json.dumps(row) for row in rows] + ['не json']
+        ))
+        out = StringIO()
+        call_command(
+            'import_posts', path, batch_size=2, stdout=out, stderr=StringIO()
+        )
+        self.assertIn('Импортировано 5 постов, пропущено 2', out.getvalue())
+        self.assertEqual(Post.objects.count(), 5)
+        self.assertEqual(
+            Post.objects.order_by('pub_date').first().pub_date.day, 1
+        )
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, 5)
+        author = User.objects.get(pk=self.user.pk)
+        self.assertEqual(author_posts_count(author), 5)
+        self.assertEqual(search_posts('импортированные').count(), 5)
+
+    def test_import_skips_rows_with_non_string_fields(self):
+        """Записи со списками и числами вместо строк пропускаются"""
+        rows = [
+            {'text': 'Автор списком', 'author': ['testuser']},
+            {'text': 'Группа словарем', 'author': 'testuser',
+             'group': {'slug': 'test-slug'}},
+            {'text': 'Дата числом', 'author': 'testuser', 'pub_date': 1},
+            {'text': ['Текст списком'], 'author': 'testuser'},
+            {'text': 'Верный пост', 'author': 'testuser', 'group': None},
+        ]
+        path = self.write_file(
+            '.jsonl', '\n'.join(json.dumps(row) for row in rows)
+        )
+        out = StringIO()
+        call_command('import_posts', path, stdout=out, stderr=StringIO())
+        self.assertIn('Импортировано 1 постов, пропущено 4', out.getvalue())
+        self.assertEqual(
+            list(Post.objects.values_list('text', flat=True)),
+            ['Верный пост']
+        )
+
+    def test_import_csv_creates_missing_authors_and_groups(self):
+        """Проверяем импорт CSV с созданием авторов и групп"""
+        path = self.write_file(
+            '.csv',
+            'text,author,group\n'
+            'Пост из CSV,new_author,new-group\n'
+            'Пост без группы,new_author,\n'
+        )
+        call_command(
+            'import_posts', path, create_missing=True, stdout=StringIO()
+        )
+        author = User.objects.get(username='new_author')
+        self.assertFalse(author.has_usable_password())
+        self.assertEqual(author.posts.count(), 2)
+        self.assertTrue(
+            Group.objects.get(slug='new-group').posts.filter(
+                text='Пост из CSV'
+            ).exists()
+        )
+
+
+class ExportPostsCommandTest(TestCase):
+    """Проверяем потоковую выгрузку постов"""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='testuser')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        Post.objects.create(
+            text='Пост в группе', author=cls.user, group=cls.group
+        )
+        Post.objects.create(text='Пост, "без" группы', author=cls.user)
+
+    def test_export_jsonl(self):
+        """Выгрузка JSONL содержит по строке на пост в порядке id"""
+        out = StringIO()
+        call_command('export_posts', chunk_size=1, stdout=out)
+        rows = [json.loads(line) for line in out.getvalue().splitlines()]
+        self.assertEqual(
+            [(row['text'], row['author'], row['group']) for row in rows],
+            [('Пост в группе', 'testuser', 'test-slug'),
+             ('Пост, "без" группы', 'testuser', None)]
+        )
+
+    def test_export_csv_can_be_imported(self):
+        """Выгрузка CSV читается командой импорта"""
+        with tempfile.TemporaryDirectory() as directory:
+            path = f'{directory}/posts.csv'
+            call_command('export_posts', format='csv', output=path)
+            Post.objects.all().delete()
+            call_command('import_posts', path, stdout=StringIO())
+        self.assertEqual(
+            set(Post.objects.values_list('text', 'group__slug')),
+            {('Пост в группе', 'test-slug'), ('Пост, "без" группы', None)}
+        )
@@ -0,0 +1,144 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test import Client, TransactionTestCase, override_settings
+from django.urls import reverse
+
+from core.utils import cached_count
+from ..counters import author_posts_count
+from ..models import Group, Post, User
+
+WRITERS = 8
+POSTS_PER_WRITER = 5
+
+
+# Ожидание блокировки записи - не медленный запрос, не засоряем лог
+@override_settings(SLOW_QUERY_THRESHOLD_MS=60 * 1000)
+class ParallelWritersTest(TransactionTestCase):
+    """
+    Проверяем, что параллельные авторы создают и правят посты
+    без ошибок блокировки базы и без потерянных обновлений счетчиков
+    """
+    def setUp(self):
+        cache.clear()
+        self.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        self.clients = []
+        for i in range(WRITERS):
+            client = Client()
+            client.force_login(User.objects.create_user(username=f'user{i}'))
+            self.clients.append(client)
+
+    def write_posts(self, client, errors):
+        try:
+            for i in range(POSTS_PER_WRITER):
+                response = client.post(reverse('posts:post_create'), {
+                    'text': f'Пост {i}', 'group': self.group.pk
+                })
+                if response.status_code != 302:
+                    errors.append(response.status_code)
+                    continue
+                post = Post.objects.filter(
+                    author__username=response.wsgi_request.user.username
+                ).latest('pk')
+                response = client.post(
+                    reverse('posts:post_edit', args=(post.pk,)),
+                    {'text': f'Измененный пост {i}', 'group': self.group.pk}
+                )
+                if response.status_code != 302:
+                    errors.append(response.status_code)
+        except Exception as error:
+            errors.append(error)
+        finally:
+            connection.close()
+
+    def test_parallel_create_and_edit(self):
+        errors = []
+        threads = [
+            threading.Thread(target=self.write_posts, args=(client, errors))
+            for client in self.clients
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        total = WRITERS * POSTS_PER_WRITER
+        self.assertEqual(
+            Post.objects.filter(text__startswith='Измененный').count(), total
+        )
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, total)
+        for author in User.objects.all():
+            with self.subTest(author=author.username):
+                self.assertEqual(
+                    author_posts_count(author), POSTS_PER_WRITER
+                )
+
+
+class PageCacheCommitTest(TransactionTestCase):
+    """
+    Проверяем, что страница или подсчет, сохраненные другим запросом
+    до фиксации изменения поста, не берутся из кэша после фиксации
+    """
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser')
+        self.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        self.post = Post.objects.create(
+            author=self.user, text='Старый текст', group=self.group
+        )
+
+    def render_in_other_request(self, url):
+        """Анонимный запрос в своем потоке со своим соединением с базой"""
+        try:
+            return Client().get(url).content.decode()
+        finally:
+            connection.close()
+
+    def test_page_rendered_before_commit_is_not_served(self):
+        """Страницы группы и автора сбрасываются еще раз при фиксации"""
+        pages = (
+            reverse('posts:group_list', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.user.username,)),
+        )
+        for page in pages:
+            Client().get(page)
+        with ThreadPoolExecutor(1) as executor:
+            with transaction.atomic():
+                self.post.text = 'Новый текст'
+                self.post.save()
+                for page in pages:
+                    stale = executor.submit(
+                        self.render_in_other_request, page
+                    ).result()
+                    self.assertIn('Старый текст', stale)
+        for page in pages:
+            with self.subTest(page=page):
+                response = Client().get(page)
+                self.assertContains(response, 'Новый текст')
+
+    def count_in_other_request(self):
+        try:
+            return cached_count(Post.objects.all())
+        finally:
+            connection.close()
+
+    def test_count_cached_before_commit_is_not_used(self):
+        """Подсчет, сохраненный до фиксации нового поста, сбрасывается"""
+        with ThreadPoolExecutor(1) as executor:
+            with transaction.atomic():
+                Post.objects.create(author=self.user, text='Второй пост')
+                self.assertEqual(
+                    executor.submit(self.count_in_other_request).result(), 1
+                )
+        self.assertEqual(cached_count(Post.objects.all()), 2)
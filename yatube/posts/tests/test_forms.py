@@ -1,13 +1,36 @@
-from django.test import TestCase, Client
+import json
+import os
+import shutil
+import tempfile
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import transaction
+from django.test import (
+    TestCase, TransactionTestCase, Client, override_settings
+)
 from django.contrib.auth import get_user_model
 from django.urls import reverse
 from django import forms
 
 from ..forms import PostForm
+from ..tasks import make_thumbnails
 from ..models import Post, Group
 
 User = get_user_model()
 
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+SMALL_GIF = (
+    b'\x47\x49\x46\x38\x39\x61\x02\x00'
+    b'\x01\x00\x80\x00\x00\x00\x00\x00'
+    b'\xFF\xFF\xFF\x21\xF9\x04\x00\x00'
+    b'\x00\x00\x00\x2C\x00\x00\x00\x00'
+    b'\x02\x00\x01\x00\x00\x02\x02\x0C'
+    b'\x0A\x00\x3B'
+)
+
 
 class PostFormTests(TestCase):
     """Тестирует правильность заполнения формы для создания поста"""
@@ -72,7 +95,8 @@ class PostFormTests(TestCase):
         """Проверяем правильное отображение названия поля формы"""
         label_value_expected = {
             'text': 'Текст',
-            'group': 'Группа'
+            'group': 'Группа',
+            'image': 'Картинка'
         }
         for field, expected in label_value_expected.items():
             with self.subTest(expected=expected):
@@ -109,7 +133,8 @@ class PostFormTests(TestCase):
         )
         form_fields = {
             'text': forms.fields.CharField,
-            'group': forms.fields.ChoiceField
+            'group': forms.fields.ChoiceField,
+            'image': forms.fields.ImageField
         }
         for value, expected in form_fields.items():
             with self.subTest(value=value):
@@ -123,9 +148,152 @@ class PostFormTests(TestCase):
         )
         form_fields = {
             'text': forms.fields.CharField,
-            'group': forms.fields.ChoiceField
+            'group': forms.fields.ChoiceField,
+            'image': forms.fields.ImageField
         }
         for value, expected in form_fields.items():
             with self.subTest(value=value):
                 field = response.context.get('form').fields.get(value)
                 self.assertIsInstance(field, expected)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PostImageTests(TestCase):
+    """Проверяем картинки постов и создание миниатюр"""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='testuser')
+        cls.authorized_client = Client()
+        cls.authorized_client.force_login(cls.user)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+
+    def create_post(self, name='small.gif'):
+        self.authorized_client.post(
+            reverse('posts:post_create'),
+            data={
+                'text': 'Пост с картинкой',
+                'image': SimpleUploadedFile(
+                    name, SMALL_GIF, content_type='image/gif'
+                ),
+            }
+        )
+        return Post.objects.get(text='Пост с картинкой')
+
+    def test_thumbnails_created_for_uploaded_image(self):
+        """
+        Проверяем, что для картинки созданы миниатюры в JPEG и WebP,
+        а лента выводит их готовые адреса
+        """
+        post = self.create_post()
+        self.assertTrue(post.image.name.startswith('posts/'))
+        thumbnail = json.loads(post.thumbnails)
+        self.assertEqual(
+            (thumbnail['width'], thumbnail['height']),
+            settings.POST_THUMBNAIL_SIZES['large']
+        )
+        directory = os.path.join(
+            TEMP_MEDIA_ROOT, 'posts', 'thumbnails', str(post.pk)
+        )
+        self.assertEqual(
+            sorted(name.rsplit('.', 1)[1] for name in os.listdir(directory)),
+            ['jpg', 'jpg', 'webp', 'webp']
+        )
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(response, thumbnail['webp_srcset'])
+        self.assertEqual(response.context['page_obj'][0].thumbnail, thumbnail)
+
+    def test_thumbnails_replaced_with_image(self):
+        """Проверяем, что при замене картинки миниатюры пересоздаются"""
+        post = self.create_post()
+        old_thumbnails = post.thumbnails
+        post.image = SimpleUploadedFile(
+            'other.gif', SMALL_GIF.replace(b'\xFF', b'\x00'),
+            content_type='image/gif'
+        )
+        post.save()
+        post.refresh_from_db()
+        self.assertNotEqual(post.thumbnails, old_thumbnails)
+        post.image = None
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.thumbnails, '')
+        self.assertFalse(os.listdir(os.path.join(
+            TEMP_MEDIA_ROOT, 'posts', 'thumbnails', str(post.pk)
+        )))
+
+    def test_thumbnails_change_profile_etag(self):
+        """Проверяем, что готовые миниатюры меняют ETag страницы автора"""
+        post = self.create_post()
+        Post.objects.filter(pk=post.pk).update(thumbnails='')
+        guest_client = Client()
+        profile = reverse('posts:profile', args=(self.user.username,))
+        etag = guest_client.get(profile)['ETag']
+        make_thumbnails(post.pk)
+        response = guest_client.get(profile, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PostImageFileTests(TransactionTestCase):
+    """Проверяем удаление файлов замененных и удаленных картинок"""
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='testuser')
+
+    def upload(self, name):
+        return SimpleUploadedFile(name, SMALL_GIF, content_type='image/gif')
+
+    def exists(self, name):
+        return os.path.exists(os.path.join(TEMP_MEDIA_ROOT, name))
+
+    def test_previous_image_deleted_after_commit(self):
+        """Файл прежней картинки удаляется только после фиксации"""
+        post = Post.objects.create(
+            author=self.user, text='Пост', image=self.upload('first.gif')
+        )
+        first = post.image.name
+        with transaction.atomic():
+            post.image = self.upload('second.gif')
+            post.save()
+            self.assertTrue(self.exists(first))
+        self.assertFalse(self.exists(first))
+        second = post.image.name
+        self.assertTrue(self.exists(second))
+        post.image = None
+        post.save()
+        self.assertFalse(self.exists(second))
+
+    def test_image_kept_when_replacement_rolled_back(self):
+        """При откате замены прежняя картинка остается на месте"""
+        post = Post.objects.create(
+            author=self.user, text='Пост', image=self.upload('first.gif')
+        )
+        first = post.image.name
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                post.image = self.upload('second.gif')
+                post.save()
+                raise RuntimeError
+        self.assertTrue(self.exists(first))
+
+    def test_image_deleted_with_post(self):
+        """Картинка удаленного поста удаляется"""
+        post = Post.objects.create(
+            author=self.user, text='Пост', image=self.upload('first.gif')
+        )
+        image = post.image.name
+        post.delete()
+        self.assertFalse(self.exists(image))
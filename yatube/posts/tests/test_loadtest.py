@@ -0,0 +1,24 @@
+from django.core.cache import cache
+from django.test import TransactionTestCase
+
+from ..benchmark import seed
+from ..loadtest import load_test_paths, run_asgi, run_wsgi
+
+
+class LoadTestTest(TransactionTestCase):
+    """Проверяем отчет нагрузочного теста WSGI и ASGI"""
+    def setUp(self):
+        cache.clear()
+        seed(posts=30, users=3, groups=2)
+
+    def test_reports_without_errors(self):
+        """Оба способа обслуживания отвечают на все запросы без ошибок"""
+        paths = load_test_paths()
+        for name, run in (('wsgi', run_wsgi), ('asgi', run_asgi)):
+            with self.subTest(server=name):
+                report = run(paths, clients=4, requests=3, threads=2)
+                self.assertEqual(report['requests'], 12)
+                self.assertEqual(report['errors'], 0)
+                self.assertGreater(report['rps'], 0)
+                latency = report['latency_ms']
+                self.assertLessEqual(latency['p50'], latency['max'])
@@ -1,7 +1,13 @@
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import connection
 from django.test import TestCase
 from django.contrib.auth import get_user_model
 
-from ..models import Group, Post
+from ..counters import author_posts_count
+from ..models import AuthorStats, Group, Post
 
 NUMBER_OF_LETTERS = 15
 
@@ -83,3 +89,80 @@ class PostModelTest(TestCase):
             with self.subTest(field=field):
                 self.assertEqual(
                     group._meta.get_field(field).help_text, expected)
+
+
+@skipUnless(connection.vendor == 'sqlite', 'План запросов SQLite')
+class PostIndexesTest(TestCase):
+    """Проверяем, что выборки для лент используют индексы"""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+
+    def test_listing_queries_use_index_scans(self):
+        """
+        Проверяем план запросов: сортировка по дате берется из индекса,
+        временное B-дерево для ORDER BY не строится
+        """
+        listings = {
+            'post_pub_date_idx': Post.objects.for_feed(),
+            'post_group_pub_date_idx': self.group.posts.for_feed(),
+            'post_author_pub_date_idx': self.user.posts.for_feed(),
+        }
+        for index_name, post_list in listings.items():
+            with self.subTest(index_name=index_name):
+                plan = post_list.order_by('-pub_date', '-pk')[:10].explain()
+                self.assertIn(f'USING INDEX {index_name}', plan)
+                self.assertNotIn('TEMP B-TREE', plan)
+
+
+class PostCountersTest(TestCase):
+    """Проверяем счетчики постов авторов и групп"""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание'
+        )
+        cls.group_2 = Group.objects.create(
+            title='Тестовая группа 2',
+            slug='test-slug-2',
+            description='Тестовое описание 2'
+        )
+
+    def assert_counters(self, author_count, group_count, group_2_count):
+        self.user.refresh_from_db()
+        self.group.refresh_from_db()
+        self.group_2.refresh_from_db()
+        self.assertEqual(author_posts_count(self.user), author_count)
+        self.assertEqual(self.group.posts_count, group_count)
+        self.assertEqual(self.group_2.posts_count, group_2_count)
+
+    def test_counters_follow_post_changes(self):
+        """Проверяем счетчики при создании, переносе и удалении поста"""
+        post = Post.objects.create(
+            author=self.user, text='Текст', group=self.group
+        )
+        Post.objects.create(author=self.user, text='Текст без группы')
+        self.assert_counters(2, 1, 0)
+        post.group = self.group_2
+        post.save()
+        self.assert_counters(2, 0, 1)
+        post.delete()
+        self.assert_counters(1, 0, 0)
+
+    def test_rebuild_post_counters_command(self):
+        """Проверяем, что команда восстанавливает счетчики"""
+        Post.objects.create(author=self.user, text='Текст', group=self.group)
+        AuthorStats.objects.all().delete()
+        Group.objects.update(posts_count=10)
+        call_command('rebuild_post_counters', stdout=StringIO())
+        self.assert_counters(1, 1, 0)
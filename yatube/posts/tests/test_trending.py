@@ -0,0 +1,156 @@
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from ..counters import activity_hour, rebuild_activity
+from ..models import AuthorActivity, Group, GroupActivity, Post
+from ..trending import TRENDING_KEY, compute_trending, get_trending
+
+User = get_user_model()
+
+
+class TrendingTest(TestCase):
+    """Проверяем корзины активности и рейтинг трендов"""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='testuser')
+        cls.user_2 = User.objects.create_user(username='testuser_2')
+        cls.group = Group.objects.create(
+            title='Тестовая группа 1',
+            slug='test-slug-1',
+            description='Тестовое описание 1'
+        )
+        cls.group_2 = Group.objects.create(
+            title='Тестовая группа 2',
+            slug='test-slug-2',
+            description='Тестовое описание 2'
+        )
+        cls.guest_client = Client()
+
+    def setUp(self):
+        cache.clear()
+
+    def buckets(self):
+        return (
+            dict(GroupActivity.objects.values_list('group', 'posts_count')),
+            dict(AuthorActivity.objects.values_list(
+                'author', 'posts_count'
+            )),
+        )
+
+    def test_buckets_follow_created_changed_and_deleted_posts(self):
+        """Корзины меняются при создании, смене группы и удалении поста"""
+        post = Post.objects.create(
+            author=self.user, text='Пост 1', group=self.group
+        )
+        Post.objects.create(author=self.user, text='Пост 2', group=self.group)
+        self.assertEqual(
+            self.buckets(), ({self.group.pk: 2}, {self.user.pk: 2})
+        )
+        post.group = self.group_2
+        post.save()
+        self.assertEqual(
+            self.buckets()[0], {self.group.pk: 1, self.group_2.pk: 1}
+        )
+        post.delete()
+        self.assertEqual(
+            self.buckets(),
+            ({self.group.pk: 1, self.group_2.pk: 0}, {self.user.pk: 1})
+        )
+
+    def test_rebuild_matches_incremental_buckets(self):
+        """Пересчет по постам дает те же корзины, что и сигналы"""
+        for i in range(3):
+            Post.objects.create(
+                author=self.user, text=f'Пост {i}', group=self.group
+            )
+        Post.objects.create(author=self.user_2, text='Пост без группы')
+        incremental = self.buckets()
+        rebuild_activity()
+        self.assertEqual(self.buckets(), incremental)
+
+    def test_windows_rank_by_posts_count(self):
+        """Окна учитывают только свежие корзины и сортируют по числу постов"""
+        Post.objects.create(author=self.user, text='Пост 1', group=self.group)
+        Post.objects.create(author=self.user, text='Пост 2', group=self.group)
+        Post.objects.create(
+            author=self.user_2, text='Пост 3', group=self.group_2
+        )
+        GroupActivity.objects.create(
+            group=self.group_2, posts_count=5,
+            hour=activity_hour(timezone.now() - timedelta(hours=5))
+        )
+        hour, day, week = compute_trending()['windows']
+        self.assertEqual(
+            [group['group__slug'] for group in hour['groups']],
+            [self.group.slug, self.group_2.slug]
+        )
+        self.assertEqual(
+            [group['posts_count'] for group in day['groups']], [6, 2]
+        )
+        self.assertEqual(hour['authors'][0]['author__username'], 'testuser')
+        self.assertEqual(week['authors'][0]['posts_count'], 2)
+
+    def test_page_renders_cached_ranking(self):
+        """Страница берет рейтинг из кэша и не обращается к корзинам"""
+        Post.objects.create(author=self.user, text='Пост 1', group=self.group)
+        get_trending()
+        with self.assertNumQueries(0):
+            response = self.guest_client.get(reverse('posts:trending'))
+        self.assertTemplateUsed(response, 'posts/trending.html')
+        self.assertContains(response, self.group.title)
+        self.assertEqual(
+            response.context['trending'], cache.get(TRENDING_KEY)
+        )
+
+    def test_empty_windows_render_list_items(self):
+        """Пустой рейтинг выводится пунктами списка"""
+        response = self.guest_client.get(reverse('posts:trending'))
+        self.assertContains(
+            response, '<li class="text-muted">Новых постов нет.</li>',
+            count=3, html=True
+        )
+
+    def test_refresh_command_updates_ranking_and_prunes_buckets(self):
+        """Команда обновляет рейтинг и удаляет устаревшие корзины"""
+        GroupActivity.objects.create(
+            group=self.group, posts_count=1,
+            hour=activity_hour(timezone.now() - timedelta(days=30))
+        )
+        get_trending()
+        Post.objects.create(author=self.user, text='Пост', group=self.group)
+        call_command('refresh_trending', stdout=StringIO())
+        self.assertEqual(GroupActivity.objects.count(), 1)
+        groups = cache.get(TRENDING_KEY)['windows'][0]['groups']
+        self.assertEqual(groups[0]['posts_count'], 1)
+
+    def test_cache_miss_does_not_prune_buckets(self):
+        """Пересчет при промахе кэша не удаляет корзины"""
+        GroupActivity.objects.create(
+            group=self.group, posts_count=1,
+            hour=activity_hour(timezone.now() - timedelta(days=30))
+        )
+        get_trending()
+        self.assertEqual(GroupActivity.objects.count(), 1)
+        self.assertIsNotNone(cache.get(TRENDING_KEY))
+
+    def test_cache_miss_waits_for_locked_refresh(self):
+        """Пока рейтинг пересчитывает другой запрос, страница ждет его"""
+        cache.add(f'{TRENDING_KEY}:lock', 1)
+        trending = {'updated': timezone.now(), 'windows': []}
+
+        def sleep(seconds):
+            # Другой запрос закончил пересчет
+            cache.set(TRENDING_KEY, trending)
+
+        with mock.patch('posts.trending.time.sleep', sleep):
+            with self.assertNumQueries(0):
+                self.assertEqual(get_trending(), trending)
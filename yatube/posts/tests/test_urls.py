@@ -1,10 +1,14 @@
+from datetime import timedelta
 from http import HTTPStatus
 
 from django.test import TestCase, Client
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.urls import reverse
+from django.utils import timezone
 
-from ..models import Post, Group
+from core.cache import page_cache_stats
+from ..models import AuthorStats, Post, Group
 
 User = get_user_model()
 
@@ -118,3 +122,112 @@ class PostURLTests(TestCase):
             with self.subTest(url=url):
                 response = self.authorized_client.get(url)
                 self.assertTemplateUsed(response, template)
+
+    def test_anonymous_pages_are_cached_until_post_changes(self):
+        """
+        Проверяем, что страницы для анонимов берутся из кэша
+        и сбрасываются только там, где выводится измененный пост
+        """
+        cache.clear()
+        group_2 = Group.objects.create(
+            title='Тестовая группа 2',
+            slug='test-slug-2',
+            description='Тестовое описание 2'
+        )
+        group_2_url = reverse('posts:group_list', args=(group_2.slug,))
+        pages = (
+            self.posts_index, self.posts_group_list,
+            self.posts_profile, group_2_url
+        )
+        for page in pages:
+            self.guest_client.get(page)
+        hits = page_cache_stats['hits']
+        for page in pages:
+            with self.subTest(page=page):
+                response = self.guest_client.get(page)
+                self.assertEqual(response['X-Page-Cache'], 'HIT')
+        self.assertEqual(page_cache_stats['hits'], hits + len(pages))
+        Post.objects.create(
+            author=self.user,
+            text='Новый пост',
+            group=self.group
+        )
+        pages_expected = {
+            self.posts_index: 'MISS',
+            self.posts_group_list: 'MISS',
+            self.posts_profile: 'MISS',
+            group_2_url: 'HIT',
+        }
+        for page, expected in pages_expected.items():
+            with self.subTest(page=page):
+                response = self.guest_client.get(page)
+                self.assertEqual(response['X-Page-Cache'], expected)
+        response = self.authorized_client.get(self.posts_index)
+        self.assertFalse(response.has_header('X-Page-Cache'))
+
+    def test_unchanged_pages_return_not_modified(self):
+        """
+        Проверяем, что неизмененная страница отдается с кодом 304,
+        а после изменения поста - заново
+        """
+        pages = (
+            self.posts_index, self.posts_group_list,
+            self.posts_profile, self.posts_post_detail
+        )
+        etags = {}
+        for page in pages:
+            with self.subTest(page=page):
+                response = self.guest_client.get(page)
+                etags[page] = response['ETag']
+                self.assertTrue(response.has_header('Last-Modified'))
+                response = self.guest_client.get(
+                    page, HTTP_IF_NONE_MATCH=etags[page]
+                )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_MODIFIED
+                )
+                response = self.authorized_client.get(
+                    page, HTTP_IF_NONE_MATCH=etags[page]
+                )
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+        self.post.text = 'Измененный текст'
+        self.post.save()
+        for page in pages:
+            with self.subTest(page=page):
+                response = self.guest_client.get(
+                    page, HTTP_IF_NONE_MATCH=etags[page]
+                )
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_deleted_post_changes_index_last_modified(self):
+        """
+        Проверяем, что удаление не самого нового поста сдвигает
+        Last-Modified главной
+        """
+        old_post = Post.objects.create(author=self.user, text='Старый пост')
+        Post.objects.create(author=self.user_two, text='Новый пост')
+        AuthorStats.objects.update(
+            posts_updated=timezone.now() - timedelta(hours=1)
+        )
+        last_modified = self.guest_client.get(
+            self.posts_index
+        )['Last-Modified']
+        old_post.delete()
+        response = self.guest_client.get(
+            self.posts_index, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_author_name_change_changes_etags(self):
+        """Проверяем, что смена имени автора меняет ETag его страниц"""
+        pages = (self.posts_index, self.posts_group_list, self.posts_profile)
+        etags = {page: self.guest_client.get(page)['ETag'] for page in pages}
+        self.user.first_name = 'Новое имя'
+        self.user.save()
+        for page in pages:
+            with self.subTest(page=page):
+                response = self.guest_client.get(
+                    page, HTTP_IF_NONE_MATCH=etags[page]
+                )
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertContains(response, 'Новое имя')
@@ -1,9 +1,24 @@
-from django.test import TestCase, Client
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock, skipUnless
+
+from django.conf import settings
+from django.core.cache import cache, caches
+from django.db import connection
+from django.test import TestCase, Client, override_settings
 from django.urls import reverse
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 
+from core.utils import approximate_count, cached_count
 from ..models import Post, Group
 from ..forms import PostForm
+from ..search import search_posts
+from .. import timeline
+from ..timeline import (
+    TIMELINE_GLOBAL, build_timeline, fan_out_post, read_timeline
+)
 
 POSTS_NUM_PAGE_ONE = 10
 POSTS_NUM_PAGE_TWO = 5
@@ -269,3 +284,261 @@ class PostPagesTests(TestCase):
                 response = self.authorized_client.get(page)
                 page_obj = response.context['page_obj']
                 self.assertEqual(len(page_obj), expected)
+
+    def test_cursor_pagination_matches_page_numbers(self):
+        """
+        Проверяем, что переход по курсору отдает те же записи,
+        что и постраничный переход, без подсчета общего числа записей
+        """
+        for page in (self.posts_index, self.posts_profile,
+                     self.posts_group_list):
+            with self.subTest(page=page):
+                first_page = self.authorized_client.get(page)
+                second_page = self.authorized_client.get(page + '?page=2')
+                next_cursor = first_page.context['page_obj'].next_cursor
+                response = self.authorized_client.get(
+                    page, {'cursor': next_cursor}
+                )
+                page_obj = response.context['page_obj']
+                self.assertTrue(page_obj.is_cursor)
+                self.assertFalse(page_obj.has_next())
+                self.assertEqual(
+                    list(page_obj), list(second_page.context['page_obj'])
+                )
+                response = self.authorized_client.get(
+                    page, {'cursor': page_obj.previous_cursor}
+                )
+                self.assertEqual(
+                    list(response.context['page_obj']),
+                    list(first_page.context['page_obj'])
+                )
+
+    def test_broken_cursor_returns_first_page(self):
+        """Проверяем, что битый курсор возвращает первую страницу"""
+        response = self.authorized_client.get(
+            self.posts_index, {'cursor': 'broken'}
+        )
+        page_obj = response.context['page_obj']
+        self.assertEqual(len(page_obj), POSTS_NUM_PAGE_ONE)
+        self.assertFalse(page_obj.has_previous())
+
+    def test_post_count_is_cached_until_post_saved(self):
+        """
+        Проверяем, что подсчет постов берется из кэша
+        и сбрасывается при создании поста
+        """
+        cache.clear()
+        post_list = self.user.posts.all()
+        self.assertEqual(cached_count(post_list), 15)
+        with self.assertNumQueries(0):
+            self.assertEqual(cached_count(post_list), 15)
+        Post.objects.create(author=self.user, text='Еще один пост')
+        self.assertEqual(cached_count(post_list), 16)
+
+    @skipUnless(connection.vendor == 'sqlite', 'Статистика SQLite')
+    @override_settings(PAGINATION_APPROXIMATE_COUNT_MIN=1)
+    def test_approximate_count_uses_table_statistics(self):
+        """Проверяем оценку числа записей по статистике SQLite"""
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE')
+        self.assertEqual(approximate_count(Post.objects.all()), 15)
+        self.assertIsNone(approximate_count(self.user.posts.all()))
+
+    def test_listing_pages_use_fixed_number_of_queries(self):
+        """
+        Проверяем, что число запросов к базе на страницах со списком
+        постов не зависит от количества постов на странице
+        """
+        guest_client = Client()
+        pages = (self.posts_index, self.posts_group_list, self.posts_profile)
+        # Версия страницы для ETag, подсчет записей или запрос
+        # группы/автора со счетчиком и выборка страницы
+        queries_expected = {
+            self.posts_index: 3,
+            self.posts_group_list: 3,
+            self.posts_profile: 3,
+        }
+        for page in pages:
+            with self.subTest(page=page):
+                cache.clear()
+                with self.assertNumQueries(queries_expected[page]):
+                    guest_client.get(page)
+                cache.clear()
+                with self.assertNumQueries(queries_expected[page]):
+                    guest_client.get(page + '?page=2')
+
+    def test_post_card_is_rendered_from_cache_until_edited(self):
+        """
+        Проверяем, что карточка поста берется из кэша
+        и перерисовывается после редактирования поста
+        """
+        caches[settings.POST_CARD_CACHE].clear()
+        # Первый пост самый старый и выводится на второй странице
+        page = self.posts_profile + '?page=2'
+        self.authorized_client.get(page)
+        with self.assertTemplateNotUsed('includes/posts_article.html'):
+            self.authorized_client.get(page)
+        form_data = {
+            'text': 'Отредактированный текст',
+            'group': self.group.id
+        }
+        self.authorized_client.post(self.posts_post_edit, data=form_data)
+        response = self.authorized_client.get(page)
+        self.assertContains(response, form_data['text'])
+
+    def test_search_finds_posts_by_word_forms(self):
+        """
+        Проверяем, что поиск находит посты по другим формам слов,
+        а ссылки паджинатора сохраняют запрос
+        """
+        Post.objects.create(
+            author=self.user_2,
+            text='Красивые деревья в осеннем парке'
+        )
+        response = self.authorized_client.get(
+            reverse('posts:search'), {'q': 'красивое дерево'}
+        )
+        page_obj = response.context['page_obj']
+        self.assertEqual(page_obj.paginator.count, 1)
+        self.assertEqual(page_obj[0].author, self.user_2)
+        response = self.authorized_client.get(
+            reverse('posts:search'), {'q': 'тестовые тексты'}
+        )
+        self.assertEqual(response.context['page_obj'].paginator.count, 15)
+        self.assertEqual(len(response.context['page_obj']), 10)
+        self.assertContains(response, '?q=%D1%82%D0%B5%D1%81%D1%82')
+        response = self.authorized_client.get(
+            reverse('posts:search'), {'q': 'отсутствующее'}
+        )
+        self.assertEqual(response.context['page_obj'].paginator.count, 0)
+
+    def test_search_without_matches_shows_empty_state(self):
+        """Проверяем, что поиск без совпадений сообщает об этом"""
+        response = self.authorized_client.get(
+            reverse('posts:search'), {'q': 'отсутствующее'}
+        )
+        self.assertContains(response, 'Найдено записей: 0')
+        self.assertContains(response, 'ничего не найдено')
+
+    def test_search_of_punctuation_only(self):
+        """Проверяем, что запрос из одних знаков препинания не ломает поиск"""
+        response = self.authorized_client.get(
+            reverse('posts:search'), {'q': '!!!'}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.context['page_obj'])
+        self.assertContains(response, 'Найдено записей: 0')
+        self.assertContains(response, 'ничего не найдено')
+        self.assertEqual(cached_count(Post.objects.none()), 0)
+
+    def test_search_index_follows_post_changes(self):
+        """Проверяем, что поисковый индекс обновляется вместе с постом"""
+        post = Post.objects.create(author=self.user, text='Старое слово')
+        post.text = 'Новое слово'
+        post.save()
+        self.assertEqual(search_posts('старое').count(), 0)
+        self.assertEqual(search_posts('новые').count(), 1)
+        post.delete()
+        self.assertEqual(search_posts('новые').count(), 0)
+
+    def test_export_is_streamed_to_staff_only(self):
+        """Проверяем, что выгрузка доступна только персоналу и идет потоком"""
+        export_url = reverse('posts:post_export')
+        response = self.authorized_client.get(export_url)
+        self.assertEqual(response.status_code, 302)
+        staff_client = Client()
+        staff_client.force_login(
+            User.objects.create_user(username='staff', is_staff=True)
+        )
+        response = staff_client.get(export_url, {'format': 'csv'})
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv; charset=utf-8')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0], 'id,text,pub_date,author,group')
+        self.assertEqual(len(lines), Post.objects.count() + 1)
+
+
+class TimelineTest(TestCase):
+    """Проверяем материализованную ленту главной страницы"""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='testuser')
+        cls.client_auth = Client()
+        cls.client_auth.force_login(cls.user)
+        for i in range(15):
+            Post.objects.create(author=cls.user, text=f'Пост {i}')
+
+    def setUp(self):
+        cache.clear()
+
+    def timeline_ids(self):
+        return [pk for _, pk in read_timeline(TIMELINE_GLOBAL)]
+
+    def test_index_builds_timeline_and_reads_it(self):
+        """Главная собирает ленту и затем выбирает посты по ее id"""
+        self.assertIsNone(read_timeline(TIMELINE_GLOBAL))
+        first = self.client_auth.get(reverse('posts:index'))
+        expected = list(Post.objects.order_by('-pub_date', '-pk'))
+        self.assertEqual(self.timeline_ids(), [post.pk for post in expected])
+        second = self.client_auth.get(reverse('posts:index'))
+        self.assertEqual(
+            list(first.context['page_obj']), list(second.context['page_obj'])
+        )
+        self.assertEqual(
+            list(second.context['page_obj']), expected[:POSTS_NUM_PAGE_ONE]
+        )
+
+    def test_new_post_is_fanned_out_and_deleted_post_removed(self):
+        """Новый пост попадает в начало ленты, удаленный - убирается"""
+        self.client_auth.get(reverse('posts:index'))
+        post = Post.objects.create(author=self.user, text='Новый пост')
+        self.assertEqual(self.timeline_ids()[0], post.pk)
+        response = self.client_auth.get(reverse('posts:index'))
+        self.assertEqual(response.context['page_obj'][0], post)
+        post.delete()
+        self.assertNotIn(post.pk, self.timeline_ids())
+
+    def test_parallel_fan_outs_keep_both_posts(self):
+        """
+        Две раскладки, идущие одновременно, не затирают друг друга:
+        вторая ждет, пока первая сохранит ленту
+        """
+        build_timeline(TIMELINE_GLOBAL)
+        now = timezone.now()
+        first, second = (
+            Post(pk=pk, pub_date=now, author=self.user)
+            for pk in (10001, 10002)
+        )
+        first_read = threading.Event()
+        release_first = threading.Event()
+        store = timeline._store
+
+        def slow_store(owner, entries):
+            if any(pk == first.pk for _, pk in entries):
+                first_read.set()
+                release_first.wait(5)
+            store(owner, entries)
+
+        with mock.patch.object(timeline, '_store', slow_store):
+            with ThreadPoolExecutor(2) as executor:
+                first_done = executor.submit(fan_out_post, first)
+                first_read.wait(5)
+                second_done = executor.submit(fan_out_post, second)
+                # Вторая раскладка успела бы прочитать ленту без первого поста
+                time.sleep(0.1)
+                release_first.set()
+                first_done.result()
+                second_done.result()
+        self.assertEqual(self.timeline_ids()[:2], [second.pk, first.pk])
+
+    @override_settings(TIMELINE_LENGTH=5)
+    def test_pages_beyond_timeline_are_read_from_database(self):
+        """Страницы за пределами ленты читаются из базы"""
+        self.client_auth.get(reverse('posts:index'))
+        self.assertEqual(len(self.timeline_ids()), 5)
+        response = self.client_auth.get(reverse('posts:index'), {'page': 2})
+        self.assertEqual(
+            list(response.context['page_obj']),
+            list(Post.objects.order_by('-pub_date', '-pk')[10:])
+        )
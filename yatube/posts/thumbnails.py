@@ -0,0 +1,80 @@
+import hashlib
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from PIL import Image, ImageOps
+
+# Форматы миниатюр: формат Pillow и расширение файла
+THUMBNAIL_FORMATS = (('JPEG', 'jpg'), ('WEBP', 'webp'))
+
+
+def thumbnail_dir(post_id):
+    return f'posts/thumbnails/{post_id}'
+
+
+def _encode(image, size, image_format):
+    thumb = ImageOps.fit(image, size, Image.LANCZOS)
+    buffer = BytesIO()
+    thumb.save(
+        buffer, image_format, quality=settings.POST_THUMBNAIL_QUALITY
+    )
+    return buffer.getvalue()
+
+
+def _save(post_id, size_name, extension, content):
+    # Хэш содержимого в имени файла позволяет кэшировать миниатюры вечно
+    digest = hashlib.md5(content).hexdigest()[:8]
+    name = f'{thumbnail_dir(post_id)}/{size_name}-{digest}.{extension}'
+    if not default_storage.exists(name):
+        name = default_storage.save(name, ContentFile(content))
+    return name
+
+
+def generate_thumbnails(post):
+    """
+    Создает миниатюры картинки поста всех размеров из
+    POST_THUMBNAIL_SIZES в JPEG и WebP и удаляет прежние.
+    Возвращает готовые для шаблона адреса и размеры.
+    """
+    with post.image.open('rb') as source:
+        image = Image.open(source)
+        image = ImageOps.exif_transpose(image).convert('RGB')
+    sizes = sorted(
+        settings.POST_THUMBNAIL_SIZES.items(), key=lambda item: item[1]
+    )
+    names = set()
+    srcsets = {extension: [] for _, extension in THUMBNAIL_FORMATS}
+    for size_name, size in sizes:
+        for image_format, extension in THUMBNAIL_FORMATS:
+            name = _save(
+                post.pk, size_name, extension,
+                _encode(image, size, image_format)
+            )
+            names.add(name)
+            srcsets[extension].append(
+                f'{default_storage.url(name)} {size[0]}w'
+            )
+    delete_thumbnails(post.pk, keep=names)
+    width, height = sizes[-1][1]
+    return {
+        'src': srcsets['jpg'][-1].split()[0],
+        'srcset': ', '.join(srcsets['jpg']),
+        'webp_srcset': ', '.join(srcsets['webp']),
+        'width': width,
+        'height': height,
+    }
+
+
+def delete_thumbnails(post_id, keep=()):
+    """Удаляет миниатюры поста, кроме перечисленных в keep."""
+    directory = thumbnail_dir(post_id)
+    try:
+        _, files = default_storage.listdir(directory)
+    except FileNotFoundError:
+        return
+    for file_name in files:
+        name = f'{directory}/{file_name}'
+        if name not in keep:
+            default_storage.delete(name)
@@ -0,0 +1,145 @@
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+
+from core.cache import cache_generation, rotate_generations
+from core.utils import CursorPaginator
+from .models import Post
+
+# Владелец общей ленты главной страницы
+TIMELINE_GLOBAL = 'all'
+
+
+def timeline_owners(post):
+    """
+    Возвращает владельцев лент, в которые попадает пост.
+    Подписок пока нет, поэтому пост уходит только в общую ленту.
+    """
+    return [TIMELINE_GLOBAL]
+
+
+def timeline_source(owner):
+    """Посты, из которых собирается лента владельца."""
+    return Post.objects.all()
+
+
+def timeline_key(owner):
+    return f'timeline:{cache_generation("timeline")}:{owner}'
+
+
+def _entry(post):
+    return post.pub_date.timestamp(), post.pk
+
+
+def _store(owner, entries):
+    caches[settings.TIMELINE_CACHE].set(
+        timeline_key(owner), entries[:settings.TIMELINE_LENGTH],
+        settings.TIMELINE_TIMEOUT
+    )
+
+
+def read_timeline(owner):
+    """
+    Возвращает ленту владельца - список пар (время публикации, id)
+    от новых постов к старым - или None, если ленты нет в кэше.
+    """
+    return caches[settings.TIMELINE_CACHE].get(timeline_key(owner))
+
+
+def build_timeline(owner, queryset=None):
+    """
+    Собирает ленту заново одним запросом и возвращает ее посты.
+    queryset позволяет сразу подгрузить поля, нужные для вывода.
+    """
+    if queryset is None:
+        queryset = timeline_source(owner)
+    posts = list(
+        queryset.order_by('-pub_date', '-pk')[:settings.TIMELINE_LENGTH]
+    )
+    _store(owner, [_entry(post) for post in posts])
+    return posts
+
+
+def _update_timeline(owner, change):
+    """
+    Меняет ленту функцией change под блокировкой: задачи раскладки
+    выполняются параллельно, и без нее одновременные изменения ленты
+    затирали бы друг друга. Если блокировку не удалось получить,
+    лента удаляется и соберется заново при чтении.
+    """
+    cache = caches[settings.TIMELINE_CACHE]
+    key = timeline_key(owner)
+    lock = f'{key}:lock'
+    deadline = time.monotonic() + settings.TIMELINE_LOCK_TIMEOUT * 2
+    while not cache.add(lock, 1, settings.TIMELINE_LOCK_TIMEOUT):
+        if time.monotonic() > deadline:
+            cache.delete(key)
+            return
+        time.sleep(0.01)
+    try:
+        entries = read_timeline(owner)
+        if entries is not None:
+            _store(owner, change(entries))
+    finally:
+        cache.delete(lock)
+
+
+def fan_out_post(post):
+    """
+    Добавляет пост в ленты его читателей. Ленты, которых нет в кэше,
+    не трогаем - они соберутся заново при первом чтении.
+    """
+    entry = _entry(post)
+
+    def add_entry(entries):
+        entries = [item for item in entries if item[1] != post.pk]
+        entries.append(entry)
+        entries.sort(reverse=True)
+        return entries
+
+    for owner in timeline_owners(post):
+        _update_timeline(owner, add_entry)
+
+
+def remove_post(post):
+    """Убирает удаленный пост из лент его читателей."""
+    for owner in timeline_owners(post):
+        _update_timeline(owner, lambda entries: [
+            item for item in entries if item[1] != post.pk
+        ])
+
+
+def invalidate_timelines():
+    """Сбрасывает все ленты, например после массовой записи постов."""
+    rotate_generations('timeline')
+
+
+class TimelinePaginator(CursorPaginator):
+    """
+    Паджинатор, который берет страницы из материализованной ленты:
+    вместо сортировки таблицы постов - выборка по списку id.
+    Страницы глубже сохраненной ленты читаются из базы как обычно.
+    """
+    owner = TIMELINE_GLOBAL
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        entries = read_timeline(self.owner)
+        if entries is not None:
+            if top > len(entries) and len(entries) < self.count:
+                return super().page(number)
+            ids = [pk for _, pk in entries[bottom:top]]
+            posts = self.object_list.in_bulk(ids)
+            if len(posts) == len(ids):
+                return self._get_page(
+                    [posts[pk] for pk in ids], number, self
+                )
+        # Ленты нет или в ней есть уже несуществующие посты,
+        # например из откаченной транзакции - собираем заново
+        posts = build_timeline(self.owner, self.object_list)
+        if top <= len(posts) or len(posts) >= self.count:
+            return self._get_page(posts[bottom:top], number, self)
+        return super().page(number)
@@ -0,0 +1,94 @@
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db.models import Sum
+from django.utils import timezone
+
+from .counters import activity_hour, activity_since
+from .models import AuthorActivity, GroupActivity
+
+TRENDING_KEY = 'trending'
+
+
+def trending_cache():
+    return caches[settings.TRENDING_CACHE]
+
+
+def _top(activity, since, *fields):
+    """Самые активные владельцы корзин с начала окна since."""
+    return [
+        dict(zip((*fields, 'posts_count'), row))
+        for row in activity.filter(hour__gte=since).values_list(
+            *fields
+        ).annotate(total=Sum('posts_count')).filter(
+            total__gt=0
+        ).order_by('-total', fields[0])[:settings.TRENDING_SIZE]
+    ]
+
+
+def compute_trending(now=None):
+    """
+    Собирает рейтинг групп и авторов по числу постов в каждом окне
+    TRENDING_WINDOWS. Суммируются часовые корзины, а не посты, поэтому
+    окно считается с точностью до часа.
+    """
+    now = now or timezone.now()
+    windows = []
+    for name, hours in settings.TRENDING_WINDOWS.items():
+        since = activity_hour(now - timedelta(hours=hours))
+        windows.append({
+            'name': name,
+            'groups': _top(
+                GroupActivity.objects, since, 'group__slug', 'group__title'
+            ),
+            'authors': _top(
+                AuthorActivity.objects, since, 'author__username',
+                'author__first_name', 'author__last_name'
+            ),
+        })
+    return {'updated': now, 'windows': windows}
+
+
+def refresh_trending():
+    """
+    Удаляет корзины старше самого длинного окна, пересчитывает рейтинг
+    и кладет его в кэш. Запускается по расписанию командой
+    refresh_trending.
+    """
+    now = timezone.now()
+    GroupActivity.objects.filter(hour__lt=activity_since(now)).delete()
+    AuthorActivity.objects.filter(hour__lt=activity_since(now)).delete()
+    trending = compute_trending(now)
+    trending_cache().set(TRENDING_KEY, trending, settings.TRENDING_TIMEOUT)
+    return trending
+
+
+def get_trending():
+    """
+    Рейтинг из кэша. Если расписание не успело его обновить, рейтинг
+    пересчитывает один запрос под блокировкой, остальные ждут его
+    результата. Старые корзины здесь не удаляются - это дело команды.
+    """
+    cache = trending_cache()
+    trending = cache.get(TRENDING_KEY)
+    if trending is not None:
+        return trending
+    lock = f'{TRENDING_KEY}:lock'
+    deadline = time.monotonic() + settings.TRENDING_LOCK_TIMEOUT
+    while not cache.add(lock, 1, settings.TRENDING_LOCK_TIMEOUT):
+        trending = cache.get(TRENDING_KEY)
+        if trending is not None:
+            return trending
+        if time.monotonic() > deadline:
+            return compute_trending()
+        time.sleep(0.05)
+    try:
+        trending = cache.get(TRENDING_KEY)
+        if trending is None:
+            trending = compute_trending()
+            cache.set(TRENDING_KEY, trending, settings.TRENDING_TIMEOUT)
+    finally:
+        cache.delete(lock)
+    return trending
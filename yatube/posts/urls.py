@@ -8,7 +8,16 @@ urlpatterns = [
     path('', views.index, name='index'),
     path('group/<slug:slug>/', views.group_posts, name='group_list'),
     path('profile/<str:username>/', views.profile, name='profile'),
+    path('search/', views.search, name='search'),
+    path('trending/', views.trending, name='trending'),
+    path('archive/', views.archive_index, name='archive_index'),
+    path(
+        'archive/<int:year>/<int:month>/',
+        views.archive_month,
+        name='archive_month'
+    ),
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
+    path('posts/export/', views.post_export, name='post_export'),
 ]
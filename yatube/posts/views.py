@@ -1,22 +1,51 @@
+from datetime import date
+from urllib.parse import urlencode
+
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
+from django.db.models.query import EmptyQuerySet
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import (
     render, get_object_or_404,
     redirect
 )
 
-from .models import Post, Group, User
+from .archive import (
+    ARCHIVE_ALL, archive_months, archive_scope, is_valid_month, month_range
+)
+from .bulk import export_rows
+from .counters import author_posts_count
+from .caching import (
+    group_pages, group_version, index_pages, index_version,
+    post_version, profile_pages, profile_version
+)
+from .models import Post, PostMonth, Group, User
 from .forms import PostForm
+from .search import search_posts
+from .timeline import TimelinePaginator
+from .trending import get_trending
+from core.cache import cache_anonymous_page, conditional_page
 from core.utils import pagination
 
 # Количество выводимых записей
 NUMBER_OF_ITEMS = 10
 POST_FIRST_ITEMS = 30
+EXPORT_CONTENT_TYPES = {
+    'jsonl': 'application/x-ndjson; charset=utf-8',
+    'csv': 'text/csv; charset=utf-8',
+}
 
 
+@conditional_page(index_version)
+@cache_anonymous_page(index_pages)
 def index(request):
     template = 'posts/index.html'
-    post_list = Post.objects.all()
-    page_obj = pagination(request, post_list, NUMBER_OF_ITEMS)
+    post_list = Post.objects.for_feed()
+    page_obj = pagination(
+        request, post_list, NUMBER_OF_ITEMS,
+        keyset=True, paginator_class=TimelinePaginator
+    )
     context = {
         'post_list': post_list,
         'page_obj': page_obj
@@ -24,11 +53,16 @@ def index(request):
     return render(request, template, context)
 
 
+@conditional_page(group_version)
+@cache_anonymous_page(group_pages)
 def group_posts(request, slug):
     template = 'posts/group_list.html'
     group = get_object_or_404(Group, slug=slug)
-    post_list = group.posts.all()
-    page_obj = pagination(request, post_list, NUMBER_OF_ITEMS)
+    post_list = group.posts.for_feed()
+    page_obj = pagination(
+        request, post_list, NUMBER_OF_ITEMS,
+        keyset=True, count=group.posts_count
+    )
     context = {
         'group': group,
         'post_list': post_list,
@@ -37,11 +71,18 @@ def group_posts(request, slug):
     return render(request, template, context)
 
 
+@conditional_page(profile_version)
+@cache_anonymous_page(profile_pages)
 def profile(request, username):
     template = 'posts/profile.html'
-    author = get_object_or_404(User, username=username)
-    post_list = author.posts.all()
-    page_obj = pagination(request, post_list, NUMBER_OF_ITEMS)
+    author = get_object_or_404(
+        User.objects.select_related('post_stats'), username=username
+    )
+    post_list = author.posts.for_feed()
+    page_obj = pagination(
+        request, post_list, NUMBER_OF_ITEMS,
+        keyset=True, count=author_posts_count(author)
+    )
     context = {
         'author': author,
         'post_list': post_list,
@@ -50,20 +91,115 @@ def profile(request, username):
     return render(request, template, context)
 
 
+def search(request):
+    template = 'posts/search.html'
+    query = request.GET.get('q', '').strip()
+    page_obj = None
+    if query:
+        results = search_posts(query)
+        # В запросе без слов, например из одних знаков, искать нечего
+        if not isinstance(results, EmptyQuerySet):
+            page_obj = pagination(request, results, NUMBER_OF_ITEMS)
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        # Ссылки паджинатора должны сохранять поисковый запрос
+        'page_prefix': urlencode({'q': query}) + '&',
+    }
+    return render(request, template, context)
+
+
+def trending(request):
+    template = 'posts/trending.html'
+    context = {
+        'trending': get_trending(),
+    }
+    return render(request, template, context)
+
+
+def archive_filter(request):
+    """
+    Архив всех постов, группы из ?group= или автора из ?author=:
+    посты, область сводки по месяцам и префикс ссылок с фильтром.
+    """
+    slug = request.GET.get('group')
+    username = request.GET.get('author')
+    if slug:
+        group = get_object_or_404(Group, slug=slug)
+        return {
+            'group': group,
+            'posts': group.posts,
+            'scope': archive_scope(group_id=group.pk),
+            'page_prefix': urlencode({'group': slug}) + '&',
+        }
+    if username:
+        author = get_object_or_404(User, username=username)
+        return {
+            'author': author,
+            'posts': author.posts,
+            'scope': archive_scope(author_id=author.pk),
+            'page_prefix': urlencode({'author': username}) + '&',
+        }
+    return {'posts': Post.objects, 'scope': ARCHIVE_ALL, 'page_prefix': ''}
+
+
+def archive_index(request):
+    template = 'posts/archive.html'
+    archive = archive_filter(request)
+    context = {
+        **archive,
+        'months': archive_months(archive['scope']),
+    }
+    return render(request, template, context)
+
+
+def archive_month(request, year, month):
+    template = 'posts/archive.html'
+    if not is_valid_month(year, month):
+        raise Http404
+    archive = archive_filter(request)
+    # Число постов месяца берется из сводки, пустой месяц не показываем
+    summary = get_object_or_404(
+        PostMonth, scope=archive['scope'],
+        month=date(year, month, 1), posts_count__gt=0
+    )
+    start, end = month_range(year, month)
+    post_list = archive['posts'].for_feed().filter(
+        pub_date__gte=start, pub_date__lt=end
+    )
+    page_obj = pagination(
+        request, post_list, NUMBER_OF_ITEMS,
+        keyset=True, count=summary.posts_count
+    )
+    context = {
+        **archive,
+        'months': archive_months(archive['scope']),
+        'current_month': summary.month,
+        'page_obj': page_obj,
+    }
+    return render(request, template, context)
+
+
+@conditional_page(post_version)
 def post_detail(request, post_id):
     template = 'posts/post_detail.html'
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author__post_stats', 'group'),
+        pk=post_id
+    )
     post_list = post.author.posts.all()
     text_in_title = post.text[:POST_FIRST_ITEMS]
     context = {
         'post': post,
         'post_list': post_list,
+        'posts_count': author_posts_count(post.author),
         'text_in_title': text_in_title,
     }
     return render(request, template, context)
 
 
 @login_required
+@transaction.atomic
 def post_create(request):
     template_name = 'posts/create_post.html'
     if request.method == 'POST':
@@ -82,6 +218,7 @@ def post_create(request):
 
 
 @login_required
+@transaction.atomic
 def post_edit(request, post_id):
     template_name = 'posts/create_post.html'
     post = get_object_or_404(Post, pk=post_id)
@@ -103,3 +240,18 @@ def post_edit(request, post_id):
             form.save()
             return redirect('posts:post_detail', post_id)
     return render(request, template_name, context)
+
+
+@staff_member_required
+def post_export(request):
+    file_format = request.GET.get('format', 'jsonl')
+    if file_format not in EXPORT_CONTENT_TYPES:
+        file_format = 'jsonl'
+    response = StreamingHttpResponse(
+        export_rows(file_format),
+        content_type=EXPORT_CONTENT_TYPES[file_format]
+    )
+    response['Content-Disposition'] = (
+        f'attachment; filename="posts.{file_format}"'
+    )
+    return response
@@ -0,0 +1,22 @@
+"""
+ASGI config for yatube project.
+
+It exposes the ASGI callable as a module-level variable named ``application``.
+Requests run in a pool of ASGI_THREADS threads, see core.asgi.
+
+Run it with any ASGI server, for example::
+
+    uvicorn yatube.asgi:application
+"""
+
+import os
+
+from django.core.wsgi import get_wsgi_application
+
+from core.asgi import ThreadPoolASGIHandler
+
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
+
+application = ThreadPoolASGIHandler(
+    get_wsgi_application(), int(os.environ.get('ASGI_THREADS', 8))
+)
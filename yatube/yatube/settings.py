@@ -32,6 +32,10 @@ ALLOWED_HOSTS = [
     'testserver',
 ]
 
+# Токен для /metrics/: Prometheus передает его в заголовке
+# Authorization: Bearer <токен>. Без токена метрики видит только персонал
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+
 
 # Application definition
 
@@ -46,10 +50,13 @@ INSTALLED_APPS = [
     'users.apps.UsersConfig',
     'core.apps.CoreConfig',
     'about.apps.AboutConfig',
+    'api.apps.ApiConfig',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.MetricsMiddleware',
     'django.middleware.security.SecurityMiddleware',
+    'core.middleware.CompressionMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -64,7 +71,8 @@ TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
 
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        # Шаблоны Django с замером времени отрисовки для /metrics/
+        'BACKEND': 'core.template_backends.TimedDjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
         'APP_DIRS': True,
         'OPTIONS': {
@@ -85,12 +93,106 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/2.2/ref/settings/#databases
 
-DATABASES = {
-    'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+# База данных задается переменными окружения. По умолчанию - SQLite,
+# DB_ENGINE=postgresql включает PostgreSQL (нужен пакет psycopg2)
+DB_ENGINE = os.environ.get('DB_ENGINE', 'sqlite')
+
+if DB_ENGINE == 'postgresql':
+    DATABASES = {
+        'default': {
+            'ENGINE': 'django.db.backends.postgresql',
+            'NAME': os.environ.get('DB_NAME', 'yatube'),
+            'USER': os.environ.get('DB_USER', 'yatube'),
+            'PASSWORD': os.environ.get('DB_PASSWORD', ''),
+            'HOST': os.environ.get('DB_HOST', 'localhost'),
+            'PORT': os.environ.get('DB_PORT', '5432'),
+            # Соединение живет между запросами, а не открывается на каждый
+            'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+            # Пул соединений pgbouncer в режиме transaction
+            # не поддерживает серверные курсоры
+            'DISABLE_SERVER_SIDE_CURSORS': (
+                os.environ.get('DB_POOLER') == 'pgbouncer'
+            ),
+            'OPTIONS': {
+                'connect_timeout': 5,
+            },
+        }
+    }
+else:
+    DATABASES = {
+        'default': {
+            # SQLite с журналом WAL и BEGIN IMMEDIATE, см. core.db.sqlite3
+            'ENGINE': 'core.db.sqlite3',
+            'NAME': os.environ.get(
+                'DB_NAME', os.path.join(BASE_DIR, 'db.sqlite3')
+            ),
+            'OPTIONS': {
+                # Сколько секунд писатель ждет освобождения блокировки
+                'timeout': 20,
+            },
+            # Тестовая база в файле, чтобы WAL и параллельная запись
+            # проверялись так же, как в работе
+            'TEST': {
+                'NAME': os.path.join(BASE_DIR, 'test_db.sqlite3'),
+            },
+        }
     }
+
+SQLITE_PRAGMAS = (
+    'journal_mode=WAL',
+    'synchronous=NORMAL',
+    'temp_store=MEMORY',
+    'cache_size=-20000',
+    'mmap_size=134217728',
+)
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+
+# Кэш задается переменными окружения. По умолчанию - память процесса:
+# годится для разработки и одного процесса. Когда процессов несколько
+# (gunicorn, ASGI, воркер очереди), нужен общий кэш: иначе сброс
+# страниц и лент виден только процессу, который его сделал.
+# CACHE_BACKEND=memcached (нужен пакет python-memcached)
+# или CACHE_BACKEND=redis (нужен пакет django-redis)
+CACHE_BACKEND = os.environ.get('CACHE_BACKEND', 'locmem')
+SHARED_CACHE_BACKENDS = {
+    'memcached': (
+        'django.core.cache.backends.memcached.MemcachedCache',
+        '127.0.0.1:11211',
+    ),
+    'redis': (
+        'django_redis.cache.RedisCache',
+        'redis://127.0.0.1:6379/1',
+    ),
 }
+CACHE_SHARED = CACHE_BACKEND in SHARED_CACHE_BACKENDS
+
+if CACHE_SHARED:
+    backend, location = SHARED_CACHE_BACKENDS[CACHE_BACKEND]
+    location = os.environ.get('CACHE_LOCATION', location)
+    CACHES = {
+        'default': {
+            'BACKEND': backend,
+            'LOCATION': location,
+        },
+        'post_cards': {
+            'BACKEND': backend,
+            'LOCATION': location,
+            'KEY_PREFIX': 'post_cards',
+        },
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        },
+        'post_cards': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': 'post_cards',
+        },
+    }
 
 
 # Password validation
@@ -132,6 +234,16 @@ USE_TZ = True
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 
 STATIC_URL = '/static/'
+STATIC_ROOT = os.path.join(BASE_DIR, 'collected_static')
+# В продакшене collectstatic добавляет хэш в имена файлов и кладет рядом
+# сжатые копии .gz и .br для отдачи веб-сервером
+if not DEBUG:
+    STATICFILES_STORAGE = 'core.storage.CompressedManifestStaticFilesStorage'
+
+MEDIA_URL = '/media/'
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Хранилище картинок и миниатюр, например S3 в продакшене
+DEFAULT_FILE_STORAGE = 'django.core.files.storage.FileSystemStorage'
 
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
@@ -139,3 +251,95 @@ LOGIN_REDIRECT_URL = 'posts:index'
 
 EMAIL_BACKEND = 'django.core.mail.backends.filebased.EmailBackend'
 EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
+
+# Кэш подсчета записей для паджинатора
+PAGINATION_COUNT_TIMEOUT = 60 * 60
+# Оценивать размер неотфильтрованных таблиц по статистике СУБД
+PAGINATION_APPROXIMATE_COUNT = False
+PAGINATION_APPROXIMATE_COUNT_MIN = 100000
+
+# Кэш отрисованных карточек постов
+POST_CARD_CACHE = 'post_cards'
+POST_CARD_TIMEOUT = 60 * 60 * 24
+
+# Кэш страниц для анонимных пользователей, сбрасывается сигналами.
+# Сброс виден всем процессам только в общем кэше, в памяти процесса
+# страница устаревает не дольше минуты
+PAGE_CACHE_TIMEOUT = 60 * 60 * 24 if CACHE_SHARED else 60
+
+# Материализованные ленты: сколько последних постов хранить и как долго.
+# Новый пост раскладывается по лентам в том процессе, который его
+# обработал, поэтому ленты должны лежать в общем кэше (CACHE_BACKEND).
+# В памяти процесса лента другого процесса отстает не дольше минуты
+TIMELINE_CACHE = 'default'
+TIMELINE_LENGTH = 200
+TIMELINE_TIMEOUT = 60 * 60 if CACHE_SHARED else 60
+# Сколько секунд живет блокировка ленты на время ее изменения
+TIMELINE_LOCK_TIMEOUT = 5
+
+# Тренды: окна в часах, размер рейтинга и его кэш. Команда
+# refresh_trending обновляет рейтинг по расписанию раз в
+# TRENDING_REFRESH_INTERVAL, кэш живет дольше, чтобы страница не ждала
+TRENDING_WINDOWS = {'час': 1, 'сутки': 24, 'неделю': 24 * 7}
+TRENDING_SIZE = 10
+TRENDING_CACHE = 'default'
+TRENDING_REFRESH_INTERVAL = 60 * 5
+TRENDING_TIMEOUT = TRENDING_REFRESH_INTERVAL * 3
+# Сколько секунд живет блокировка пересчета рейтинга при промахе кэша
+TRENDING_LOCK_TIMEOUT = 10
+
+# Сжатие HTML-страниц и ответов API на лету
+COMPRESSION_NAMESPACES = ('posts', 'api')
+COMPRESSION_CONTENT_TYPES = ('text/html', 'application/json')
+COMPRESSION_MIN_SIZE = 200
+
+# Размер страницы JSON API по умолчанию и наибольший по ?limit=
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+# Сколько постов можно запросить одним пакетом
+API_BATCH_MAX_IDS = 300
+
+# Срок хранения статичных страниц about в браузере и прокси
+ABOUT_PAGE_MAX_AGE = 60 * 60 * 24
+
+# Фоновые задачи: в режиме отладки и в тестах выполняются сразу,
+# иначе ждут в очереди команду run_worker. Воркер - отдельный процесс,
+# поэтому без TASKS_EAGER нужен общий кэш (check --deploy, core.E001)
+TASKS_EAGER = DEBUG
+TASKS_WORKER_THREADS = 4
+TASKS_MAX_ATTEMPTS = 5
+TASKS_RETRY_DELAY = 10
+TASKS_STALE_TIMEOUT = 60 * 10
+
+# Размеры миниатюр картинок постов, создаются фоновой задачей
+POST_THUMBNAIL_SIZES = {
+    'small': (480, 170),
+    'large': (960, 339),
+}
+POST_THUMBNAIL_QUALITY = 85
+
+# Статистика SQL-запросов по отпечаткам
+SLOW_QUERY_THRESHOLD_MS = 100
+QUERY_STATS_SAMPLES = 1000
+QUERY_STATS_FLUSH_INTERVAL = 30
+QUERY_STATS_DIR = os.path.join(BASE_DIR, 'query_stats')
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'yatube.slow_queries': {
+            'handlers': ['console'],
+            'level': 'WARNING',
+        },
+        'yatube.tasks': {
+            'handlers': ['console'],
+            'level': 'ERROR',
+        },
+    },
+}
@@ -13,13 +13,24 @@ Including another URLconf
     1. Import the include() function: from django.urls import include, path
     2. Add a URL to urlpatterns:  path('blog/', include('blog.urls'))
 """
+from django.conf import settings
+from django.conf.urls.static import static
 from django.contrib import admin
 from django.urls import path, include
 
+from core.views import metrics
+
 urlpatterns = [
     path('', include(('posts.urls', 'posts'), namespace='posts')),
     path('admin/', admin.site.urls),
     path('auth/', include(('users.urls', 'users'), namespace='users')),
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include(('about.urls', 'about'), namespace='about')),
+    path('api/v1/', include(('api.urls', 'api'), namespace='api')),
+    path('metrics/', metrics, name='metrics'),
 ]
+
+if settings.DEBUG:
+    urlpatterns += static(
+        settings.MEDIA_URL, document_root=settings.MEDIA_ROOT
+    )